@@ -0,0 +1,99 @@
+"""
+Bytes per document of the chunk representation in DOC_STORE entries, before
+and after chunks became offsets into the document text.
+
+Before: a "chunks" list with one string per overlapping chunk, plus a
+"chunk_meta" list with one dict per chunk (page, page_end, start, end,
+tokens). After: "chunk_spans", "chunk_pages" and "chunk_tokens" int32
+arrays; chunk strings are rebuilt by main.stored_chunk only for returned
+sources. Both are measured with tracemalloc over the same iter_chunks output
+of the synthetic deed corpus. The text, facts, embeddings and BM25 fields are
+identical in both and reported for scale only.
+
+    python -m benchmarks.bench_doc_memory
+    python -m benchmarks.bench_doc_memory --docs 500 --pages 50
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import main
+from benchmarks.synthetic import deed_pages
+
+
+def _traced(build):
+    """(result, bytes still allocated by build())"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def _legacy(chunked):
+    # Fresh copies, so the strings and dicts are allocated (and counted) here
+    return {
+        "chunks": [chunk.encode("utf-8").decode("utf-8") for chunk, _ in chunked],
+        "chunk_meta": [dict(meta) for _, meta in chunked],
+    }
+
+
+def _compact(chunked):
+    return {
+        "chunk_spans": np.array([(m["start"], m["end"]) for _, m in chunked], dtype=np.int32).reshape(-1, 2),
+        "chunk_pages": np.array([(m["page"], m["page_end"]) for _, m in chunked], dtype=np.int32).reshape(-1, 2),
+        "chunk_tokens": np.array([m["tokens"] for _, m in chunked], dtype=np.int32),
+    }
+
+
+def main_(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    dim = main.EMBED_MODEL.get().get_sentence_embedding_dimension()
+    itemsize = np.dtype(main.EMBED_STORAGE).itemsize
+    totals = {"text": 0, "legacy": 0, "compact": 0, "embeddings": 0, "chunks": 0}
+    keep = []  # hold every representation so nothing is freed between measurements
+    materialize_seconds = 0.0
+    for seed in range(args.docs):
+        pages = deed_pages(seed=seed, pages=args.pages)
+        text, text_bytes = _traced(lambda: "\n".join(pages))
+        chunked = list(main.iter_chunks(pages))
+        legacy, legacy_bytes = _traced(lambda: _legacy(chunked))
+        compact, compact_bytes = _traced(lambda: _compact(chunked))
+        entry = {"text": text, **compact}
+        started = time.perf_counter()
+        assert main.stored_chunks(entry) == legacy["chunks"]
+        materialize_seconds += time.perf_counter() - started
+        keep.append((text, legacy, compact))
+        totals["text"] += text_bytes
+        totals["legacy"] += legacy_bytes
+        totals["compact"] += compact_bytes
+        totals["embeddings"] += len(chunked) * dim * itemsize
+        totals["chunks"] += len(chunked)
+
+    per_doc = {key: value / args.docs for key, value in totals.items()}
+    print(f"{args.docs} documents x {args.pages} pages, {per_doc['chunks']:.0f} chunks per document")
+    print(f"{'field':<36} {'bytes/doc':>12}")
+    print(f"{'text (unchanged)':<36} {per_doc['text']:>12,.0f}")
+    print(f"{'embeddings ' + main.EMBED_STORAGE + ' (unchanged)':<36} {per_doc['embeddings']:>12,.0f}")
+    print(f"{'before: chunks + chunk_meta':<36} {per_doc['legacy']:>12,.0f}")
+    print(f"{'after: chunk_spans/pages/tokens':<36} {per_doc['compact']:>12,.0f}")
+    before = per_doc["text"] + per_doc["legacy"] + per_doc["embeddings"]
+    after = per_doc["text"] + per_doc["compact"] + per_doc["embeddings"]
+    print(f"text + chunks + embeddings: {before:,.0f} -> {after:,.0f} bytes/doc ({after / before:.1%})")
+    print(f"stored_chunk: {materialize_seconds / max(1, totals['chunks']) * 1e6:.1f} us per chunk materialized")
+
+
+if __name__ == "__main__":
+    try:
+        main_()
+    finally:
+        # Importing main created a spill dir; the app's shutdown hook never runs here
+        main.DOC_STORE.close()
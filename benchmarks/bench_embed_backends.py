@@ -0,0 +1,74 @@
+"""
+Embedding throughput and parity of the LEGALEASE_EMBED_BACKEND options
+(main.load_embed_model) on synthetic deed chunks.
+
+Every backend encodes the same chunks. The report shows texts/sec for one
+batched pass (after a warm-up) and the cosine similarity of each vector to the
+torch baseline (min / mean). A min cosine close to 1.0 means retrieval ranks
+are unaffected. The first ONNX run exports the model into LEGALEASE_ONNX_DIR.
+
+The ONNX backends are off by default. --min-cosine turns the run into the
+acceptance check for enabling one: the exit code is 1 if any backend's
+minimum cosine to torch falls below it.
+
+    python -m benchmarks.bench_embed_backends
+    python -m benchmarks.bench_embed_backends --backends torch onnx-int8 --docs 10 --pages 20
+    python -m benchmarks.bench_embed_backends --min-cosine 0.99
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import main
+from benchmarks.synthetic import deed_pages
+
+
+def main_(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--docs", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=main.EMBED_BATCH_SIZE)
+    parser.add_argument("--min-cosine", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    chunks = [
+        chunk
+        for seed in range(args.docs)
+        for chunk, _ in main.iter_chunks(deed_pages(seed=seed, pages=args.pages))
+    ]
+    print(f"{len(chunks)} chunks, batch size {args.batch_size}")
+
+    baseline = None
+    failed = []
+    print(f"{'backend':<10} {'load s':>8} {'texts/s':>10} {'min cos':>9} {'mean cos':>9}")
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        started = time.perf_counter()
+        model = main.load_embed_model(main.EMBED_MODEL_NAME, backend)
+        load_seconds = time.perf_counter() - started
+        model.encode(chunks[:args.batch_size], batch_size=args.batch_size, normalize_embeddings=True)
+        started = time.perf_counter()
+        embeddings = np.asarray(
+            model.encode(chunks, batch_size=args.batch_size, normalize_embeddings=True), dtype=np.float32,
+        )
+        rate = len(chunks) / (time.perf_counter() - started)
+        if baseline is None:
+            baseline = embeddings
+        cosines = np.einsum("ij,ij->i", embeddings, baseline)
+        if backend in args.backends:
+            print(f"{backend:<10} {load_seconds:>8.2f} {rate:>10.1f} {cosines.min():>9.5f} {cosines.mean():>9.5f}")
+        if args.min_cosine is not None and cosines.min() < args.min_cosine:
+            failed.append(backend)
+    if failed:
+        print(f"below --min-cosine {args.min_cosine}: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main_()
+    finally:
+        # Importing main created a spill dir; the app's shutdown hook never runs here
+        main.DOC_STORE.close()
@@ -0,0 +1,99 @@
+"""
+Worst-case timing check for the fact-extraction engine (main.scan_facts).
+
+Each adversarial input is generated at doubling sizes and the growth exponent
+of scan_facts' run time is measured between the smallest and largest size
+(1.0 = linear, 2.0 = quadratic).
+The run fails (exit code 1) if any input exceeds --max-exponent. --legacy also
+times the original per-field regexes on the same inputs for comparison.
+
+    python -m benchmarks.bench_extract
+    python -m benchmarks.bench_extract --legacy --base 25 --doublings 2   # legacy is quadratic: keep it small
+"""
+import argparse
+import math
+import re
+import sys
+import time
+
+import main
+from benchmarks.synthetic import deed_text
+
+# The original patterns, for --legacy comparisons only
+LEGACY_PATTERNS = [
+    (r'BETWEEN\s+.*?\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+),', re.IGNORECASE | re.DOTALL),
+    (r'\bAND\b\s+.*?\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+),', re.IGNORECASE | re.DOTALL),
+    (r'(VENDOR|SELLER)[^\n]*\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+)', re.IGNORECASE),
+    (r"([A-Za-z\s]+)\s+District,\s*Tamil Nadu", re.IGNORECASE),
+    (r'Rupees\s+[A-Za-z\s]+Only', re.IGNORECASE),
+    (r'[\d,]+\s*Lakhs', re.IGNORECASE),
+]
+
+# Inputs that make backtracking regexes go quadratic: lots of match starts, no match
+ADVERSARIAL = {
+    "and_no_comma": lambda n: ("and the land and the house " * 4 + "\n") * n,
+    "between_blank_lines": lambda n: "BETWEEN " + "\n \n" * (n * 20),
+    "vendor_one_line": lambda n: "vendor " * (n * 10) + "\n" + "\n" * (n * 10) + "5",
+    "prose_no_header": lambda n: "the vendor shall convey the land to the purchaser " * (n * 2),
+    "digits_no_lakhs": lambda n: "1,2," * (n * 20),
+    "rupees_no_only": lambda n: "Rupees twenty five " * (n * 5),
+    "trailing_blank_label": lambda n: "Village:" + "\n" * (n * 40),
+    "synthetic_deed": lambda n: deed_text(seed=1, pages=max(1, n // 100)),
+}
+
+
+def _time(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _legacy_scan(text: str):
+    for pattern, flags in LEGACY_PATTERNS:
+        re.search(pattern, text, flags)
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", type=int, default=400, help="size parameter of the smallest input")
+    parser.add_argument("--doublings", type=int, default=4)
+    parser.add_argument("--max-exponent", type=float, default=1.4,
+                        help="largest allowed growth exponent of time vs. input size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy", action="store_true", help="also time the original regexes (slow)")
+    args = parser.parse_args()
+
+    failed = []
+    for name, make in ADVERSARIAL.items():
+        sizes = [args.base * 2 ** i for i in range(args.doublings + 1)]
+        points = []
+        for n in sizes:
+            text = make(n)
+            elapsed = _time(main.scan_facts, text, args.repeat)
+            line = f"{name:<22}{len(text):>10} chars  engine {elapsed * 1000:9.2f} ms"
+            if args.legacy:
+                line += f"  legacy {_time(_legacy_scan, text, 1) * 1000:10.2f} ms"
+            print(line)
+            points.append((len(text), elapsed))
+        (n0, t0), (n1, t1) = points[0], points[-1]
+        exponent = math.log(t1 / t0) / math.log(n1 / n0)
+        print(f"{name:<22}growth exponent {exponent:.2f}")
+        if exponent > args.max_exponent:
+            failed.append((name, exponent))
+
+    if failed:
+        for name, exponent in failed:
+            print(f"NOT LINEAR: {name} grows with exponent {exponent:.2f}", file=sys.stderr)
+        sys.exit(1)
+    print("ok: extraction time grows linearly on every adversarial input")
+
+
+if __name__ == "__main__":
+    try:
+        main_()
+    finally:
+        # Importing main created a spill dir; the app's shutdown hook never runs here
+        main.DOC_STORE.close()
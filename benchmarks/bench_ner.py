@@ -0,0 +1,79 @@
+"""
+NER benchmark: full en_core_web_sm pipeline over the whole text (the old
+extract_facts path) vs. the NER-only, segmented path in main.extract_entities.
+
+Each (mode, size) runs in a fresh process so peak RSS is not shared.
+
+    python -m benchmarks.bench_ner --pages 10 100 500
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import time
+import tracemalloc
+
+from benchmarks.synthetic import deed_text
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 / 1024
+
+
+def _run(mode: str, pages: int, queue):
+    text = deed_text(seed=pages, pages=pages)
+    if mode == "full":
+        import spacy
+        nlp = spacy.load("en_core_web_sm")
+        nlp.max_length = max(nlp.max_length, len(text) + 1)
+
+        def run():
+            return [(e.label_, e.text, e.start_char, e.end_char) for e in nlp(text).ents]
+    else:
+        import main
+        main.extract_entities("warm up")
+
+        def run():
+            return main.extract_entities(text)
+
+    rss_before = _rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    entities = run()
+    elapsed = time.perf_counter() - started
+    if mode != "full":
+        main.DOC_STORE.close()  # importing main created a spill dir
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put({
+        "mode": mode,
+        "pages": pages,
+        "chars": len(text),
+        "entities": len(entities),
+        "seconds": round(elapsed, 3),
+        "traced_peak_mb": round(py_peak / 1024 / 1024, 1),
+        "rss_growth_mb": round(max(0.0, rss_peak - rss_before), 1),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    print(f"{'mode':<8}{'pages':>7}{'chars':>10}{'ents':>7}{'sec':>9}{'traced MB':>11}{'rss+ MB':>9}")
+    for pages in args.pages:
+        for mode in ("full", "trimmed"):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_run, args=(mode, pages, queue))
+            proc.start()
+            row = queue.get()
+            proc.join()
+            print(f"{row['mode']:<8}{row['pages']:>7}{row['chars']:>10}{row['entities']:>7}"
+                  f"{row['seconds']:>9}{row['traced_peak_mb']:>11}{row['rss_growth_mb']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Recall@k and memory of quantized chunk embeddings (main.quantize_embeddings)
+against the float32 baseline.
+
+Chunks come from the synthetic deed corpus. Queries are the common /ask
+questions plus random chunk excerpts. For every storage mode, with and without
+full-precision rescoring, this reports recall@k against the float32 top-k
+(1.0 = identical answers) and bytes per stored vector.
+
+    python -m benchmarks.bench_quantization
+    python -m benchmarks.bench_quantization --docs 50 --pages 20 --top-k 3 5
+"""
+import argparse
+import random
+
+import numpy as np
+
+import main
+from benchmarks.synthetic import deed_pages
+
+QUESTIONS = [
+    "Who is the vendor?",
+    "Who is the purchaser?",
+    "What is the sale consideration?",
+    "What are the boundaries of the property?",
+    "Is there any encumbrance on the property?",
+    "When was the deed registered?",
+    "Which village is the land in?",
+    "What are the witnesses' names?",
+]
+
+
+def _queries(chunks, count: int, rng: random.Random):
+    queries = list(QUESTIONS)
+    for chunk in rng.sample(chunks, min(count, len(chunks))):
+        words = chunk.split()
+        start = rng.randrange(max(1, len(words) - 12))
+        queries.append(" ".join(words[start:start + 12]))
+    return queries
+
+
+def main_(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="random chunk excerpts on top of the fixed questions")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[3, 5])
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    docs = []
+    for seed in range(args.docs):
+        chunks = [chunk for chunk, _ in main.iter_chunks(deed_pages(seed=seed, pages=args.pages))]
+        embeddings = main.EMBED_MODEL.get().encode(chunks, batch_size=main.EMBED_BATCH_SIZE, normalize_embeddings=True)
+        docs.append((chunks, np.asarray(embeddings, dtype=np.float32)))
+    all_chunks = [c for chunks, _ in docs for c in chunks]
+    queries = _queries(all_chunks, args.queries, rng)
+    query_embeddings = np.asarray(
+        main.EMBED_MODEL.get().encode(queries, batch_size=main.EMBED_BATCH_SIZE, normalize_embeddings=True),
+        dtype=np.float32,
+    )
+    print(f"{len(docs)} documents, {len(all_chunks)} chunks, {len(queries)} queries per document")
+
+    print(f"{'storage':<8} {'rescore':<8} {'bytes/vec':>9} " + " ".join(f"{f'recall@{k}':>9}" for k in args.top_k))
+    for storage in ("float32", "float16", "int8"):
+        for rescore in ((False,) if storage == "float32" else (False, True)):
+            nbytes = 0
+            hits = {k: 0 for k in args.top_k}
+            total = {k: 0 for k in args.top_k}
+            for _, full in docs:
+                compact, scales = main.quantize_embeddings(full, storage)
+                nbytes += compact.nbytes + (scales.nbytes if scales is not None else 0)
+                for query in query_embeddings:
+                    for k in args.top_k:
+                        truth = set(main.top_k_indices(full @ query, k).tolist())
+                        found, _ = main.rank_chunks(query, compact, scales, full if rescore else None, k)
+                        hits[k] += len(truth & set(found.tolist()))
+                        total[k] += len(truth)
+            vectors = sum(len(full) for _, full in docs)
+            print(f"{storage:<8} {'yes' if rescore else 'no':<8} {nbytes / vectors:>9.0f} "
+                  + " ".join(f"{hits[k] / total[k]:>9.4f}" for k in args.top_k))
+
+
+if __name__ == "__main__":
+    try:
+        main_()
+    finally:
+        # Importing main created a spill dir; the app's shutdown hook never runs here
+        main.DOC_STORE.close()
@@ -0,0 +1,172 @@
+"""
+Stage-level micro-benchmarks over the synthetic sale-deed corpus.
+
+Each stage (PDF extraction, serial and across CPU_POOL, fact extraction, chunking, indexing, snippets,
+search) is timed at every document size pytest-benchmark style: repeated
+rounds, reported as min / median / mean / stddev. Peak traced Python memory
+comes from one extra round under tracemalloc, so it doesn't skew the timings.
+search_document measures retrieval with question embeddings already cached.
+
+Runs offline: Hugging Face lookups are disabled (models must be in the local
+cache), TTS uses the stub backend and startup warmup is skipped.
+
+    python -m benchmarks.bench_stages --pages 1 10 100 500 --save benchmarks/baseline.json
+    python -m benchmarks.bench_stages --pages 1 10 100 500 --compare benchmarks/baseline.json --max-slowdown 1.25
+
+--compare exits with code 1 if any stage's --metric is more than
+--max-slowdown times its baseline. Baselines are machine specific.
+"""
+import os
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+os.environ.setdefault("LEGALEASE_TTS_BACKEND", "stub")
+os.environ.setdefault("LEGALEASE_WARMUP", "0")
+
+import argparse
+import asyncio
+import json
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import main
+from benchmarks.synthetic import deed_pages, deed_pdf
+
+# Questions that get past detect_intent_and_answer to retrieval (hybrid path);
+# _stages adds an identifier question for the keyword-only path
+QUESTIONS = [
+    "Which court has jurisdiction over disputes?",
+    "Were taxes paid before the sale?",
+]
+
+
+def _stages(pages: int, workdir: str):
+    """(name, zero-arg callable) for every stage at this document size."""
+    page_texts = deed_pages(seed=pages, pages=pages)
+    text = "\n".join(page_texts)
+    pdf_path = os.path.join(workdir, f"deed_{pages}.pdf")
+    with open(pdf_path, "wb") as f:
+        f.write(deed_pdf(seed=pages, pages=pages))
+    facts = main.extract_facts(text)
+    document_id = f"bench-{pages}"
+    main.build_document_index(text, document_id, facts, page_texts)
+    chunks = main.stored_chunks(main.DOC_STORE[document_id])
+    boundary_sf = re.search(r"S\.F\. No (\d+)", text)
+    questions = QUESTIONS + [f"Is S.F. No {boundary_sf.group(1) if boundary_sf else 1} mentioned?"]
+
+    def snippets():
+        for question in questions:
+            for chunk in chunks:
+                main.snippet_around(chunk, question)
+
+    def search():
+        for question in questions:
+            main.search_document(question, document_id)
+
+    return [
+        ("extract_text_from_pdf", lambda: main.extract_text_from_pdf(pdf_path)),
+        ("extract_pdf_pages_parallel", lambda: asyncio.run(main.extract_pdf_pages_parallel(pdf_path))),
+        ("extract_facts", lambda: main.extract_facts(text)),
+        ("extract_role_parties", lambda: main.extract_role_parties(text)),
+        ("chunk_text", lambda: main.chunk_text(text)),
+        ("build_document_index", lambda: main.build_document_index(text, document_id, facts, page_texts)),
+        ("snippet_around", snippets),
+        ("search_document", search),
+    ]
+
+
+def _time(fn, min_rounds: int, min_time: float, max_rounds: int) -> dict:
+    fn()  # warm-up round, not recorded
+    times = []
+    started = time.perf_counter()
+    while len(times) < max_rounds and (len(times) < min_rounds or time.perf_counter() - started < min_time):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return {
+        "rounds": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def _peak_mb(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main_(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--stages", nargs="+", help="only run these stages")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--max-rounds", type=int, default=100)
+    parser.add_argument("--min-time", type=float, default=0.5, help="keep running rounds for at least this many seconds")
+    parser.add_argument("--save", help="write results as a baseline JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    parser.add_argument("--metric", choices=["min", "median", "mean"], default="median")
+    args = parser.parse_args(argv)
+
+    main.EMBED_MODEL.get()
+    main.NER_MODEL.get()
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+    print(f"{'stage':<26} {'pages':>5} {'rounds':>6} {'min ms':>10} {'median ms':>10} {'mean ms':>10} "
+          f"{'stddev':>8} {'peak MB':>8} {'vs base':>8}")
+    with tempfile.TemporaryDirectory(prefix="legalease_bench_") as workdir:
+        for pages in args.pages:
+            for name, fn in _stages(pages, workdir):
+                if args.stages and name not in args.stages:
+                    continue
+                key = f"{name}@{pages}"
+                stats = _time(fn, args.min_rounds, args.min_time, args.max_rounds)
+                stats["peak_mb"] = _peak_mb(fn)
+                results[key] = stats
+                ratio = ""
+                if key in baseline:
+                    slowdown = stats[args.metric] / baseline[key][args.metric]
+                    ratio = f"{slowdown:.2f}x"
+                    if slowdown > args.max_slowdown:
+                        regressions.append((key, slowdown))
+                print(f"{name:<26} {pages:>5} {stats['rounds']:>6} {stats['min'] * 1000:>10.2f} "
+                      f"{stats['median'] * 1000:>10.2f} {stats['mean'] * 1000:>10.2f} "
+                      f"{stats['stddev'] * 1000:>8.2f} {stats['peak_mb']:>8.1f} {ratio:>8}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpus": os.cpu_count()},
+                "metric_units": "seconds",
+                "results": results,
+            }, f, indent=2)
+        print(f"baseline written to {args.save}")
+    if regressions:
+        for key, slowdown in regressions:
+            print(f"REGRESSION {key}: {args.metric} {slowdown:.2f}x baseline (limit {args.max_slowdown:.2f}x)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main_()
+    finally:
+        # Importing main created a spill dir; the app's shutdown hook never runs here
+        main.DOC_STORE.close()
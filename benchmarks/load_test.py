@@ -0,0 +1,373 @@
+"""
+Load test for /analyze and /ask under concurrent traffic.
+
+Each concurrency level runs for --duration seconds. In that time, --concurrency
+clients send a weighted mix of /analyze uploads (synthetic deed PDFs) and /ask
+questions, one request after another. Before the first level, --seed-docs
+documents are analyzed so /ask has targets. Documents added by /analyze during
+the run become targets too.
+
+For every level the report gives throughput, p50/p95/p99 latency per endpoint,
+and the error rate (non-2xx or failed requests, 429s included). /metrics is
+sampled every --sample-interval seconds. The sample timeline records DOC_STORE
+size and process RSS over the whole run. With --workers > 1 each sample comes
+from whichever worker answered.
+
+The app runs in-process by default (TTS stub, startup warmup skipped, models
+loaded before the first level). --serve starts a local uvicorn with the same
+settings instead; with --workers > 1 it also uses the sqlite document store in
+a temporary LEGALEASE_DATA_DIR, so every worker sees every document. --url
+targets a server that is already running; start it with
+LEGALEASE_TTS_BACKEND=stub so gTTS isn't called.
+
+    python -m benchmarks.load_test --concurrency 1 4 16 --duration 20 --save benchmarks/load.json
+    python -m benchmarks.load_test --serve --workers 2 --mix analyze=1 ask=19
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --compare benchmarks/load.json --max-slowdown 1.25
+
+--compare exits with code 1 if any level's p99 for any endpoint is more than
+--max-slowdown times its baseline. Results are machine specific.
+"""
+import os
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+os.environ.setdefault("LEGALEASE_TTS_BACKEND", "stub")
+os.environ.setdefault("LEGALEASE_WARMUP", "0")
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import platform
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.synthetic import deed_pdf
+
+# A review checklist: fact intents, identifier lookups and free-text retrieval
+QUESTIONS = [
+    "Who is the vendor?",
+    "Who is the purchaser?",
+    "What is the sale consideration?",
+    "What is the survey number?",
+    "Which court has jurisdiction over disputes?",
+    "Were taxes paid before the sale?",
+    "Is there any encumbrance on the property?",
+    "What are the boundaries of the property?",
+    "When was the deed registered?",
+    "Who are the witnesses?",
+]
+GAUGES = {
+    "legalease_documents": "documents",
+    "legalease_doc_store_resident_bytes": "doc_store_resident_bytes",
+    "legalease_embedding_bytes_resident": "embedding_bytes_resident",
+    "process_resident_memory_bytes": "rss_bytes",
+}
+
+
+def _percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+
+def _summary(records, seconds: float) -> dict:
+    latencies = sorted(r["latency"] for r in records)
+    errors = sum(1 for r in records if not r["ok"])
+    return {
+        "requests": len(records),
+        "errors": errors,
+        "error_rate": errors / len(records) if records else 0.0,
+        "throughput_rps": len(records) / seconds,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "max": latencies[-1] if latencies else 0.0,
+    }
+
+
+class LoadRun:
+    """Shared state of one run: PDFs to upload, known document ids, request records and samples."""
+
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.pdfs = [deed_pdf(seed=args.seed * 100000 + i, pages=args.pdf_pages) for i in range(args.pdf_variants)]
+        self.next_pdf = 0
+        self.document_ids = []
+        self.records = []
+        self.timeline = []
+        self.started = time.perf_counter()
+        names, weights = zip(*args.mix.items())
+        self.ops = list(names)
+        self.weights = list(weights)
+
+    async def analyze(self) -> dict:
+        pdf = self.pdfs[self.next_pdf % len(self.pdfs)]
+        self.next_pdf += 1
+        response = await self.client.post("/analyze", files={"file": ("deed.pdf", pdf, "application/pdf")})
+        response.raise_for_status()
+        body = response.json()
+        self.document_ids.append(body["document_id"])
+        return {"cache_hit": body.get("cache_hit")}
+
+    async def ask(self) -> dict:
+        response = await self.client.post("/ask", json={
+            "document_id": self.rng.choice(self.document_ids),
+            "question": self.rng.choice(QUESTIONS),
+        })
+        response.raise_for_status()
+        return {"answer_source": response.json().get("answer_source")}
+
+    async def one(self, op: str, level: int):
+        started = time.perf_counter()
+        record = {"op": op, "level": level, "t": started - self.started}
+        try:
+            record.update(await getattr(self, op)())
+            record["ok"] = True
+            record["status"] = 200
+        except httpx.HTTPStatusError as e:
+            record.update(ok=False, status=e.response.status_code)
+        except Exception as e:
+            record.update(ok=False, status=type(e).__name__)
+        record["latency"] = time.perf_counter() - started
+        self.records.append(record)
+
+    async def client_loop(self, level: int, deadline: float):
+        while time.perf_counter() < deadline:
+            await self.one(self.rng.choices(self.ops, self.weights)[0], level)
+
+    async def sample(self, level: int) -> dict:
+        point = {"t": time.perf_counter() - self.started, "level": level}
+        try:
+            text = (await self.client.get("/metrics")).text
+        except Exception:
+            return point
+        for line in text.splitlines():
+            name, _, value = line.partition(" ")
+            if name in GAUGES:
+                point[GAUGES[name]] = float(value)
+        self.timeline.append(point)
+        return point
+
+    async def sampler(self, level_ref: list, stop: asyncio.Event):
+        while not stop.is_set():
+            await self.sample(level_ref[0])
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), self.args.sample_interval)
+
+
+async def _run(client: httpx.AsyncClient, args) -> dict:
+    run = LoadRun(client, args)
+    for _ in range(args.seed_docs):
+        await run.analyze()
+    level_ref = [0]
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(run.sampler(level_ref, stop))
+
+    levels = []
+    print(f"{'conc':>4} {'endpoint':<8} {'requests':>8} {'rps':>8} {'err %':>6} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for concurrency in args.concurrency:
+        level_ref[0] = concurrency
+        first = len(run.records)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(run.client_loop(concurrency, deadline) for _ in range(concurrency)))
+        seconds = time.perf_counter() - started
+        records = run.records[first:]
+        result = {
+            "concurrency": concurrency,
+            "seconds": seconds,
+            "all": _summary(records, seconds),
+            "endpoints": {op: _summary([r for r in records if r["op"] == op], seconds) for op in run.ops},
+            "status_counts": {},
+            "analyze_cache_hits": sum(1 for r in records if r.get("cache_hit")),
+        }
+        for r in records:
+            key = str(r["status"])
+            result["status_counts"][key] = result["status_counts"].get(key, 0) + 1
+        levels.append(result)
+        for name, stats in [*result["endpoints"].items(), ("all", result["all"])]:
+            print(f"{concurrency:>4} {name:<8} {stats['requests']:>8} {stats['throughput_rps']:>8.1f} "
+                  f"{stats['error_rate'] * 100:>6.1f} {stats['p50'] * 1000:>9.1f} {stats['p95'] * 1000:>9.1f} "
+                  f"{stats['p99'] * 1000:>9.1f} {stats['max'] * 1000:>9.1f}")
+
+    stop.set()
+    await sampler
+    await run.sample(level_ref[0])
+    return {"levels": levels, "timeline": run.timeline}
+
+
+async def _run_in_process(args) -> dict:
+    import main
+
+    main.EMBED_MODEL.get()
+    main.NER_MODEL.get()
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://legalease", timeout=args.timeout) as client:
+                return await _run(client, args)
+    finally:
+        # Also when startup or the run fails, so the spill dir made at import never outlives us
+        main.DOC_STORE.close()
+
+
+async def _run_remote(url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 2)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        return await _run(client, args)
+
+
+@contextlib.contextmanager
+def _uvicorn(workers: int):
+    """
+    Local uvicorn on a free port with the stub TTS backend; yields its base URL once /readyz answers.
+
+    With workers > 1 the workers must share documents, so unless the caller set
+    them, LEGALEASE_DOC_BACKEND is sqlite and LEGALEASE_DATA_DIR a temporary
+    directory that is removed afterwards.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {**os.environ, "LEGALEASE_TTS_BACKEND": "stub"}
+    data_dir = None
+    if workers > 1:
+        env.setdefault("LEGALEASE_DOC_BACKEND", "sqlite")
+        if "LEGALEASE_DATA_DIR" not in env:
+            data_dir = env["LEGALEASE_DATA_DIR"] = tempfile.mkdtemp(prefix="legalease_load_")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            with contextlib.suppress(httpx.HTTPError):
+                if httpx.get(f"{url}/readyz", timeout=2).status_code == 200:
+                    break
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become ready within 120s")
+            time.sleep(0.5)
+        yield url
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+        if data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def _mix(values) -> dict:
+    mix = {}
+    for value in values:
+        match = re.fullmatch(r"(analyze|ask)=(\d+(?:\.\d+)?)", value)
+        if not match:
+            raise argparse.ArgumentTypeError(f"--mix entries look like analyze=1 or ask=9, got {value!r}")
+        mix[match.group(1)] = float(match.group(2))
+    return {op: weight for op, weight in mix.items() if weight > 0}
+
+
+def main_(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server (default: drive the app in-process)")
+    target.add_argument("--serve", action="store_true", help="start a local uvicorn for the run")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --serve")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    parser.add_argument("--mix", nargs="+", default=["analyze=1", "ask=9"], help="relative weights, e.g. analyze=1 ask=9")
+    parser.add_argument("--pdf-pages", type=int, default=10)
+    parser.add_argument("--pdf-variants", type=int, default=200,
+                        help="distinct PDFs; uploads beyond this repeat bytes and hit the analysis cache")
+    parser.add_argument("--seed-docs", type=int, default=4, help="documents analyzed before the first level")
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="results JSON to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.25)
+    args = parser.parse_args(argv)
+    args.mix = _mix(args.mix)
+    if not args.mix:
+        parser.error("--mix needs at least one positive weight")
+    if args.seed_docs < 1 and "ask" in args.mix:
+        parser.error("/ask needs --seed-docs >= 1")
+
+    if args.url:
+        results = asyncio.run(_run_remote(args.url, args))
+    elif args.serve:
+        with _uvicorn(args.workers) as url:
+            results = asyncio.run(_run_remote(url, args))
+    else:
+        results = asyncio.run(_run_in_process(args))
+
+    timeline = results["timeline"]
+    if timeline:
+        first, last = timeline[0], timeline[-1]
+        for key in ("documents", "doc_store_resident_bytes", "rss_bytes"):
+            if key in first and key in last:
+                scale = 1 if key == "documents" else 1024 * 1024
+                unit = "" if key == "documents" else " MB"
+                print(f"{key}: {first[key] / scale:.1f}{unit} -> {last[key] / scale:.1f}{unit} "
+                      f"over {last['t'] - first['t']:.0f}s")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+        for level in results["levels"]:
+            base = baseline.get(level["concurrency"])
+            if base is None:
+                continue
+            for op, stats in level["endpoints"].items():
+                base_stats = base["endpoints"].get(op)
+                if not base_stats or not base_stats["p99"] or not stats["requests"]:
+                    continue
+                slowdown = stats["p99"] / base_stats["p99"]
+                print(f"conc {level['concurrency']:>3} {op:<8} p99 {slowdown:.2f}x baseline, "
+                      f"throughput {stats['throughput_rps'] / (base_stats['throughput_rps'] or 1):.2f}x")
+                if slowdown > args.max_slowdown:
+                    regressions.append((level["concurrency"], op, slowdown))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpus": os.cpu_count()},
+                "target": args.url or ("uvicorn" if args.serve else "in-process"),
+                "config": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+                "metric_units": "seconds",
+                **results,
+            }, f, indent=2)
+        print(f"results written to {args.save}")
+    if regressions:
+        for concurrency, op, slowdown in regressions:
+            print(f"REGRESSION concurrency {concurrency} {op}: p99 {slowdown:.2f}x baseline "
+                  f"(limit {args.max_slowdown:.2f}x)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,140 @@
+"""
+Deterministic synthetic sale-deed corpus used by the benchmarks.
+
+Text follows the layout the extractors in main.py expect (VENDOR / PURCHASER
+headings, BETWEEN ... AND blocks, "Survey No:" style labels, Rs. amounts and
+dd-mm-yyyy dates), padded with recital paragraphs to reach a page count.
+deed_pdf renders the same pages as a minimal text-only PDF, so
+extract_text_from_pdf can be measured without any PDF-writing dependency.
+"""
+import random
+from typing import List
+
+FIRST_NAMES = [
+    "Ravi", "Priya", "Senthil", "Lakshmi", "Murugan", "Kavitha", "Arun", "Meena",
+    "Karthik", "Divya", "Suresh", "Anitha", "Ganesh", "Revathi", "Vijay", "Saranya",
+]
+LAST_NAMES = [
+    "Kumar", "Devi", "Raman", "Subramanian", "Natarajan", "Krishnan", "Pillai", "Selvam",
+]
+VILLAGES = ["Perur", "Peelamedu", "Singanallur", "Vadavalli", "Kovaipudur", "Thudiyalur"]
+DISTRICTS = ["Coimbatore", "Tiruppur", "Erode", "Salem", "Madurai", "Chennai"]
+RECITALS = [
+    "The Vendor hereby covenants that the schedule property is free from all encumbrances, "
+    "charges, liens, attachments and mortgages of any kind whatsoever.",
+    "The Vendor has this day put the Purchaser in vacant possession of the schedule property "
+    "and the Purchaser shall hereafter enjoy the same absolutely.",
+    "All taxes, cesses and other dues payable in respect of the schedule property up to the "
+    "date of this deed have been paid by the Vendor.",
+    "The Vendor undertakes to execute such further documents as may be required to perfect "
+    "the title of the Purchaser to the schedule property.",
+    "The schedule property was acquired by the Vendor under a registered partition deed and "
+    "has been in continuous and uninterrupted possession since then.",
+    "The Purchaser is entitled to have the patta transferred to his or her name and the "
+    "Vendor shall sign all applications for mutation of revenue records.",
+    "The boundaries of the schedule property have been verified on the spot with reference "
+    "to the field measurement book and the survey sketch.",
+    "Any dispute arising out of this deed shall be subject to the jurisdiction of the courts "
+    "in the district in which the schedule property is situated.",
+]
+LINES_PER_PAGE = 40
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(1995, 2025)}"
+
+
+def _amount(rng: random.Random) -> str:
+    lakhs = rng.randint(5, 150)
+    return f"Rs. {lakhs},00,000/-"
+
+
+def deed_pages(seed: int = 0, pages: int = 1) -> List[str]:
+    """Return the text of a synthetic sale deed as one string per page."""
+    rng = random.Random(seed)
+    vendor, purchaser = _name(rng), _name(rng)
+    village, district = rng.choice(VILLAGES), rng.choice(DISTRICTS)
+    survey = f"{rng.randint(1, 999)}/{rng.randint(1, 9)}{rng.choice('ABC')}"
+
+    first = [
+        "SALE DEED",
+        f"{district} District, Tamil Nadu",
+        f"This Sale Deed is executed on {_date(rng)} BETWEEN",
+        f"Mr. {vendor}, son of {_name(rng)}, residing at {rng.randint(1, 200)} Gandhi Street, {village}",
+        "hereinafter called the VENDOR",
+        f"Mr. {vendor}",
+        "AND",
+        f"Ms. {purchaser}, daughter of {_name(rng)}, residing at {rng.randint(1, 200)} Anna Nagar, {district}",
+        "hereinafter called the PURCHASER",
+        f"Ms. {purchaser}",
+        f"for a total sale consideration of {_amount(rng)} (Rupees {rng.choice(['Ten', 'Twenty Five', 'Forty'])} Lakhs Only)",
+        f"Survey No: {survey}",
+        f"Patta No: {rng.randint(100, 9999)}",
+        f"Village: {village}",
+        f"Taluk: {village}",
+        f"District: {district}",
+        f"BOUNDARIES: North by road, South by land of {_name(rng)}, East by canal, West by S.F. No {rng.randint(1, 999)}",
+    ]
+    result = []
+    for page_no in range(pages):
+        lines = list(first) if page_no == 0 else [f"Page {page_no + 1}"]
+        while len(lines) < LINES_PER_PAGE:
+            sentence = rng.choice(RECITALS)
+            if rng.random() < 0.2:
+                sentence += f" Witnessed by {_name(rng)} on {_date(rng)}."
+            if rng.random() < 0.1:
+                sentence += f" A sum of {_amount(rng)} was paid by way of advance."
+            lines.append(sentence)
+        result.append("\n".join(lines))
+    return result
+
+
+def deed_text(seed: int = 0, pages: int = 1) -> str:
+    """Whole-document text, joined the same way main.extract_text_from_pdf joins pages."""
+    return "\n".join(deed_pages(seed, pages))
+
+
+def _pdf_page_stream(page: str) -> bytes:
+    ops = ["BT /F1 9 Tf 36 806 Td 11 TL"]
+    for line in page.split("\n"):
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        ops.append(f"({escaped}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1", "replace")
+
+
+def deed_pdf(seed: int = 0, pages: int = 1) -> bytes:
+    """The deed_pages text as a PDF (one PDF page per text page, Helvetica, one text line per line)."""
+    return pages_pdf(deed_pages(seed, pages))
+
+
+def pages_pdf(page_texts: List[str]) -> bytes:
+    """Any list of page texts as a PDF, laid out like deed_pdf (e.g. an amended deed)."""
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a (content, page) pair per page
+    objects = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in page_texts:
+        stream = _pdf_page_stream(page)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R >> >> >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
@@ -1,19 +1,48 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import bisect
+import contextlib
+import difflib
+import functools
+import hashlib
+import json
+import logging
+import multiprocessing
+import shutil
+import signal
+import sqlite3
+import sys
 import tempfile
+import threading
+import time
 import os
+import queue
 import re
+import subprocess
+import wave
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 from PyPDF2 import PdfReader
 import spacy
 from gtts import gTTS
-from sentence_transformers import SentenceTransformer
 import numpy.linalg as LA
 
+_MODULE_STARTED = time.perf_counter()
+
 app = FastAPI()
 
+logger = logging.getLogger("legalease")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(os.getenv("LEGALEASE_LOG_LEVEL", "INFO").upper())
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,14 +51,1433 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-nlp = spacy.load("en_core_web_sm")
+
+
+def load_ner_pipeline(name: str):
+    """
+    Load a spaCy pipeline with everything except NER disabled.
+    extract_facts only reads doc.ents, so the tagger, parser, lemmatizer etc. are
+    pure overhead. A component NER listens to (a shared tok2vec) is kept enabled.
+    """
+    pipeline = spacy.load(name)
+    keep = {"ner"}
+    for pipe_name, pipe in pipeline.pipeline:
+        if "ner" in (getattr(pipe, "listening_components", None) or []):
+            keep.add(pipe_name)
+    pipeline.select_pipes(enable=[n for n in pipeline.pipe_names if n in keep])
+    return pipeline
+
+
+class OnnxEmbedder:
+    """
+    all-MiniLM-L6-v2 served through ONNX Runtime instead of PyTorch.
+    Implements the slice of the SentenceTransformer interface this module uses:
+    encode(..., normalize_embeddings=...), get_sentence_embedding_dimension(),
+    max_seq_length and tokenizer. Pooling is the model's mean pooling over
+    the attention mask.
+    """
+
+    def __init__(self, model_path: str, tokenizer, max_seq_length: int, dim: int, threads: int):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self._dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        out = np.zeros((len(sentences), self._dim), dtype=np.float32)
+        # Like SentenceTransformer, batch by length so padding stays small
+        order = sorted(range(len(sentences)), key=lambda i: -len(sentences[i]))
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [sentences[i] for i in idx], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np",
+            )
+            feed = {k: v.astype(np.int64) for k, v in inputs.items() if k in self._input_names}
+            token_embeddings = self.session.run(None, feed)[0]
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            out[idx] = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if normalize_embeddings:
+            out /= np.clip(LA.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out[0] if single else out
+
+
+def export_onnx_model(name: str, onnx_dir: str, quantize: bool) -> str:
+    """
+    Export `name` to ONNX once (plus a dynamic-int8 copy when `quantize`) and
+    return the model path. Needs torch and onnx only the first time.
+    """
+    fp32_path = os.path.join(onnx_dir, "model.onnx")
+    config_path = os.path.join(onnx_dir, "legalease.json")
+    path = os.path.join(onnx_dir, "model.int8.onnx") if quantize else fp32_path
+    # model.onnx is published last, so its presence (with the config) means the
+    # tokenizer files are complete too; a crash mid-export just re-exports.
+    if os.path.exists(path) and os.path.exists(config_path):
+        return path
+    os.makedirs(onnx_dir, exist_ok=True)
+    if not (os.path.exists(fp32_path) and os.path.exists(config_path)):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        st_model = SentenceTransformer(name, device="cpu")
+        transformer = st_model[0].auto_model.eval()
+        dummy = st_model.tokenizer(["warm up"], return_tensors="pt")
+        names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in dummy]
+        tmp_path = f"{fp32_path}.{os.getpid()}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer, tuple(dummy[k] for k in names), tmp_path,
+                input_names=names, output_names=["last_hidden_state"],
+                dynamic_axes={k: {0: "batch", 1: "sequence"} for k in names + ["last_hidden_state"]},
+                opset_version=14,
+            )
+        st_model.tokenizer.save_pretrained(onnx_dir)
+        tmp_config = f"{config_path}.{os.getpid()}.tmp"
+        with open(tmp_config, "w", encoding="utf-8") as f:
+            json.dump({"max_seq_length": st_model.max_seq_length,
+                       "dim": st_model.get_sentence_embedding_dimension()}, f)
+        os.replace(tmp_config, config_path)
+        os.replace(tmp_path, fp32_path)
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, path)
+    return path
+
+
+def load_embed_model(name: str, backend: str = "torch"):
+    """
+    backend: "torch" (SentenceTransformer), "onnx" or "onnx-int8" (ONNX Runtime,
+    exported on first use into LEGALEASE_ONNX_DIR).
+    """
+    if backend == "torch":
+        # Imported here so the torch import cost is paid on first use, not at startup
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"LEGALEASE_EMBED_BACKEND must be torch, onnx or onnx-int8, got {backend!r}")
+    logger.warning("embedding backend %s is opt-in; check parity with benchmarks.bench_embed_backends", backend)
+    from transformers import AutoTokenizer
+
+    onnx_dir = os.getenv("LEGALEASE_ONNX_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "legalease", "onnx", name.replace("/", "--"),
+    )
+    path = export_onnx_model(name, onnx_dir, quantize=backend == "onnx-int8")
+    with open(os.path.join(onnx_dir, "legalease.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    return OnnxEmbedder(
+        path, AutoTokenizer.from_pretrained(onnx_dir), config["max_seq_length"], config["dim"],
+        threads=int(os.getenv("LEGALEASE_ONNX_THREADS", str(os.cpu_count() or 1))),
+    )
+
+
+class LazyModel:
+    """Thread-safe handle that loads a model on first use (or on warmup) and keeps it."""
+
+    def __init__(self, name: str, loader):
+        self.name = name
+        self._loader = loader
+        self._model = None
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+        # A worker forked while another thread held the lock would otherwise deadlock
+        if hasattr(os, "register_at_fork"):  # POSIX only
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self):
+        model = self._model
+        if model is not None:
+            return model
+        with self._lock:
+            if self._model is None:
+                start = time.perf_counter()
+                self._model = self._loader()
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                logger.info("loaded %s in %.2fs", self.name, self.load_seconds)
+            return self._model
+
+
+NER_MODEL = LazyModel("spacy-ner", functools.partial(load_ner_pipeline, "en_core_web_sm"))
+# Long documents are split into segments this size (on line boundaries) before
+# NER, which keeps spaCy's per-doc memory flat and stays clear of nlp.max_length.
+NER_SEGMENT_CHARS = int(os.getenv("LEGALEASE_NER_SEGMENT_CHARS", "20000"))
 
 AUDIO_DIR = os.path.join(tempfile.gettempdir(), "legalease_audio")
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
-# Global in-memory document store for RAG
-DOC_STORE: Dict[str, dict] = {}
-EMBED_MODEL = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+class DocumentStore:
+    """
+    Byte-budgeted document store for RAG.
+    Keeps the most recently queried documents in memory and spills the least
+    recently queried ones to disk (embeddings as .npy, the rest as JSON).
+    Spilled documents are reloaded transparently on the next lookup, with the
+    embeddings memory-mapped instead of read into RAM.
+    """
+
+    def __init__(self, budget_bytes: int, spill_dir: str, reserved_bytes=lambda: 0):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.reserved_bytes = reserved_bytes  # memory held outside the store that shares its budget
+        self._resident: "OrderedDict[str, dict]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._spilled: Dict[str, str] = {}   # document_id -> spill directory
+        self._resident_bytes = 0
+        self._lock = threading.RLock()
+        os.makedirs(spill_dir, exist_ok=True)
+
+    # Array fields written straight to disk on insert and only ever memory-mapped
+    DISK_ONLY_FIELDS = ("full_embeddings",)
+
+    @staticmethod
+    def _entry_nbytes(entry: dict) -> int:
+        size = sys.getsizeof(entry.get("text", ""))
+        size += sum(sys.getsizeof(t) + 120 for t in entry.get("bm25_terms", ()))  # key + [offset, count]
+        for key, value in entry.items():
+            if isinstance(value, np.ndarray) and not isinstance(value, np.memmap):
+                size += value.nbytes
+            elif isinstance(value, (dict, list)) and key != "bm25_terms":
+                # facts, page_entities, versions, ...: grow with every amendment
+                size += len(json.dumps(value, ensure_ascii=False, default=str))
+        return size
+
+    def _spill_path(self, document_id: str) -> str:
+        return os.path.join(self.spill_dir, document_id)
+
+    def _write_disk_only(self, document_id: str, entry: dict):
+        path = self._spill_path(document_id)
+        for key in self.DISK_ONLY_FIELDS:
+            if isinstance(entry.get(key), np.ndarray):
+                os.makedirs(path, exist_ok=True)
+                np.save(os.path.join(path, f"{key}.npy"), entry[key])
+                entry[key] = np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r")
+
+    def _write_spill(self, document_id: str, entry: dict) -> str:
+        path = self._spill_path(document_id)
+        os.makedirs(path, exist_ok=True)
+        arrays = [k for k, v in entry.items() if isinstance(v, np.ndarray)]
+        for key in arrays:
+            if key not in self.DISK_ONLY_FIELDS:
+                np.save(os.path.join(path, f"{key}.npy"), np.asarray(entry[key]))
+        meta = {k: v for k, v in entry.items() if k not in arrays}
+        meta["_arrays"] = arrays
+        with open(os.path.join(path, "doc.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return path
+
+    def _read_spill(self, path: str) -> dict:
+        with open(os.path.join(path, "doc.json"), encoding="utf-8") as f:
+            entry = json.load(f)
+        for key in entry.pop("_arrays"):
+            entry[key] = np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r")
+        return entry
+
+    def _remove_spill(self, document_id: str):
+        self._spilled.pop(document_id, None)
+        shutil.rmtree(self._spill_path(document_id), ignore_errors=True)
+
+    def _evict(self, keep: str):
+        """Spill least-recently-queried documents until we are back under budget."""
+        while self._resident_bytes + self.reserved_bytes() > self.budget_bytes and len(self._resident) > 1:
+            document_id, entry = next(iter(self._resident.items()))
+            if document_id == keep:
+                self._resident.move_to_end(document_id)
+                continue
+            del self._resident[document_id]
+            self._resident_bytes -= self._sizes.pop(document_id)
+            # Files survive a reload, so a document that was already spilled
+            # and has not changed since can be dropped without rewriting.
+            if document_id not in self._spilled:
+                self._spilled[document_id] = self._write_spill(document_id, entry)
+
+    def __setitem__(self, document_id: str, entry: dict):
+        with self._lock:
+            if document_id in self._resident:
+                self._resident_bytes -= self._sizes.pop(document_id)
+                del self._resident[document_id]
+            self._remove_spill(document_id)
+            self._write_disk_only(document_id, entry)
+            self._resident[document_id] = entry
+            self._sizes[document_id] = self._entry_nbytes(entry)
+            self._resident_bytes += self._sizes[document_id]
+            self._evict(keep=document_id)
+
+    def __getitem__(self, document_id: str) -> dict:
+        with self._lock:
+            if document_id in self._resident:
+                self._resident.move_to_end(document_id)
+                return self._resident[document_id]
+            if document_id not in self._spilled:
+                raise KeyError(document_id)
+            entry = self._read_spill(self._spilled[document_id])
+            self._resident[document_id] = entry
+            self._sizes[document_id] = self._entry_nbytes(entry)
+            self._resident_bytes += self._sizes[document_id]
+            self._evict(keep=document_id)
+            return entry
+
+    def __delitem__(self, document_id: str):
+        with self._lock:
+            if document_id not in self._resident and document_id not in self._spilled:
+                raise KeyError(document_id)
+            if document_id in self._resident:
+                del self._resident[document_id]
+                self._resident_bytes -= self._sizes.pop(document_id)
+            self._remove_spill(document_id)
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._resident or document_id in self._spilled
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.keys())
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._resident.keys()) + [d for d in self._spilled if d not in self._resident]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resident": len(self._resident),
+                "spilled": len([d for d in self._spilled if d not in self._resident]),
+                "backend": "memory",
+                "resident_bytes": self._resident_bytes,
+                "budget_bytes": self.budget_bytes,
+                "embedding_bytes": sum(
+                    v.nbytes for entry in self._resident.values() for k, v in entry.items()
+                    if "embedding" in k and isinstance(v, np.ndarray) and not isinstance(v, np.memmap)
+                ),
+            }
+
+    def close(self):
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+class SharedDocumentStore:
+    """
+    Document store shared by all worker processes on a host (uvicorn --workers N).
+    Text, chunks and facts live in SQLite in WAL mode, so readers never block the
+    writer and concurrent writers queue on a short transaction. Array fields
+    (embeddings, BM25 postings) are .npy files written before the row is
+    committed and memory-mapped by every worker, so the page cache holds one copy
+    however many workers there are. Each process keeps a small LRU of decoded
+    rows, revalidated against the row version on every lookup.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            document_id TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            meta TEXT NOT NULL,     -- JSON of the non-array fields
+            arrays TEXT NOT NULL,   -- JSON list of array field names
+            created REAL NOT NULL
+        );
+        -- Append-only log other workers replay into their in-process ANN index
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            document_id TEXT NOT NULL,
+            op TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, data_dir: str, cache_entries: int = 256):
+        self.data_dir = data_dir
+        self.arrays_dir = os.path.join(data_dir, "arrays")
+        self.db_path = os.path.join(data_dir, "documents.sqlite3")
+        self.cache_entries = cache_entries
+        self._cache: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()  # document_id -> (version, entry)
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(self.arrays_dir, exist_ok=True)
+        self._db().executescript(self.SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        """One connection per thread and process (connections must not cross a fork)."""
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _array_dir(self, document_id: str, version: str) -> str:
+        return os.path.join(self.arrays_dir, f"{document_id}-{version}")
+
+    def _load(self, document_id: str, version: str, meta: str, arrays: str) -> dict:
+        entry = json.loads(meta)
+        path = self._array_dir(document_id, version)
+        for key in json.loads(arrays):
+            entry[key] = np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r")
+        return entry
+
+    def _cache_put(self, document_id: str, version: str, entry: dict):
+        with self._cache_lock:
+            self._cache[document_id] = (version, entry)
+            self._cache.move_to_end(document_id)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def __setitem__(self, document_id: str, entry: dict):
+        version = os.urandom(8).hex()
+        arrays = [k for k, v in entry.items() if isinstance(v, np.ndarray)]
+        # Arrays go to disk first, under a name no reader knows yet
+        path = self._array_dir(document_id, version)
+        tmp_path = f"{path}.tmp"
+        os.makedirs(tmp_path)
+        for key in arrays:
+            np.save(os.path.join(tmp_path, f"{key}.npy"), np.asarray(entry[key]))
+        os.rename(tmp_path, path)
+        meta = json.dumps({k: v for k, v in entry.items() if k not in arrays}, ensure_ascii=False)
+
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            old = db.execute("SELECT version FROM documents WHERE document_id = ?", (document_id,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO documents (document_id, version, meta, arrays, created) VALUES (?, ?, ?, ?, ?)",
+                (document_id, version, meta, json.dumps(arrays), time.time()),
+            )
+            # 'replace' tells other workers to refresh vectors they already hold
+            db.execute("INSERT INTO changes (document_id, op) VALUES (?, ?)",
+                       (document_id, "replace" if old else "put"))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        if old:
+            # Workers still holding the old memmaps keep reading them after unlink
+            shutil.rmtree(self._array_dir(document_id, old[0]), ignore_errors=True)
+        try:
+            self._cache_put(document_id, version, self._load(document_id, version, meta, json.dumps(arrays)))
+        except FileNotFoundError:
+            pass  # already replaced by another worker
+
+    def __getitem__(self, document_id: str) -> dict:
+        db = self._db()
+        for _ in range(3):
+            row = db.execute("SELECT version FROM documents WHERE document_id = ?", (document_id,)).fetchone()
+            if row is None:
+                with self._cache_lock:
+                    self._cache.pop(document_id, None)
+                raise KeyError(document_id)
+            with self._cache_lock:
+                cached = self._cache.get(document_id)
+                if cached is not None and cached[0] == row[0]:
+                    self._cache.move_to_end(document_id)
+                    return cached[1]
+            row = db.execute(
+                "SELECT version, meta, arrays FROM documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+            if row is None:
+                continue
+            try:
+                entry = self._load(document_id, *row)
+            except FileNotFoundError:
+                continue  # replaced by another worker between the two reads; look again
+            self._cache_put(document_id, row[0], entry)
+            return entry
+        raise KeyError(document_id)
+
+    def __delitem__(self, document_id: str):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT version FROM documents WHERE document_id = ?", (document_id,)).fetchone()
+            if row is None:
+                raise KeyError(document_id)
+            db.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+            db.execute("INSERT INTO changes (document_id, op) VALUES (?, 'delete')", (document_id,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        shutil.rmtree(self._array_dir(document_id, row[0]), ignore_errors=True)
+        with self._cache_lock:
+            self._cache.pop(document_id, None)
+
+    def __contains__(self, document_id: str) -> bool:
+        return self._db().execute("SELECT 1 FROM documents WHERE document_id = ?", (document_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def keys(self) -> List[str]:
+        return [r[0] for r in self._db().execute("SELECT document_id FROM documents ORDER BY created")]
+
+    def changes_since(self, seq: int) -> List[Tuple[int, str, str]]:
+        return self._db().execute(
+            "SELECT seq, document_id, op FROM changes WHERE seq > ? ORDER BY seq", (seq,)
+        ).fetchall()
+
+    def stats(self) -> dict:
+        total = len(self)
+        with self._cache_lock:
+            cached = [entry for _, entry in self._cache.values()]
+        return {
+            "backend": "sqlite",
+            "resident": len(cached),
+            "spilled": max(0, total - len(cached)),
+            "resident_bytes": sum(DocumentStore._entry_nbytes(entry) for entry in cached),
+            "budget_bytes": 0,
+            "embedding_bytes": 0,  # always memory-mapped
+            "data_dir": self.data_dir,
+        }
+
+    def close(self):
+        # Shared with other workers: only drop this thread's connection
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+# Global document store for RAG. "memory" (default) is a per-process,
+# memory-budgeted store that spills to disk; "sqlite" is shared by all workers
+# on the host via LEGALEASE_DATA_DIR and is required for uvicorn --workers N.
+DOC_STORE_BACKEND = os.getenv("LEGALEASE_DOC_BACKEND", "memory")
+DOC_STORE_BUDGET_BYTES = int(float(os.getenv("LEGALEASE_DOC_STORE_BUDGET_MB", "1024")) * 1024 * 1024)
+if DOC_STORE_BACKEND == "sqlite":
+    DOC_STORE = SharedDocumentStore(
+        os.getenv("LEGALEASE_DATA_DIR") or os.path.join(tempfile.gettempdir(), "legalease_data"),
+        int(os.getenv("LEGALEASE_DOC_CACHE_ENTRIES", "256")),
+    )
+elif DOC_STORE_BACKEND == "memory":
+    SPILL_DIR = tempfile.mkdtemp(
+        prefix="legalease_spill_",
+        dir=os.getenv("LEGALEASE_SPILL_DIR") or None,
+    )
+    # CORPUS_INDEX (defined below) keeps a float16 copy of every chunk vector in
+    # memory; it counts against the same budget, so more documents spill instead
+    DOC_STORE = DocumentStore(DOC_STORE_BUDGET_BYTES, SPILL_DIR, reserved_bytes=lambda: CORPUS_INDEX.nbytes())
+else:
+    raise ValueError(f"LEGALEASE_DOC_BACKEND must be memory or sqlite, got {DOC_STORE_BACKEND!r}")
+
+
+class AnalysisCache:
+    """Content-addressed cache of /analyze results, keyed by SHA-256 of the uploaded bytes."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, result = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+ANALYSIS_CACHE = AnalysisCache(
+    max_entries=int(os.getenv("LEGALEASE_ANALYSIS_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("LEGALEASE_ANALYSIS_CACHE_TTL", str(24 * 3600))),
+)
+
+
+class CorpusIndex:
+    """
+    Corpus-wide approximate nearest-neighbour index over every indexed chunk (IVF).
+    Vectors are bucketed by their nearest k-means centroid; a query only scores the
+    `nprobe` closest buckets, so latency grows with sqrt(corpus) rather than linearly.
+    Small corpora are searched exhaustively until there is enough data to train.
+    Training runs on a background thread; adds and searches continue meanwhile.
+    Vectors are kept as float16 to limit the cost of this second copy, and
+    nbytes() is counted against the memory DOC_STORE budget.
+    """
+
+    def __init__(self, min_train: int = 2048, nprobe: int = 16, retrain_factor: float = 4.0):
+        self.min_train = min_train
+        self.nprobe = nprobe
+        self.retrain_factor = retrain_factor
+        self._dim: Optional[int] = None
+        self._vectors = np.zeros((0, 0), dtype=np.float16)
+        self._row_doc: List[Optional[str]] = []      # None once the row is deleted
+        self._row_chunk = np.zeros(0, dtype=np.int32)
+        self._doc_rows: Dict[str, List[int]] = {}
+        self._size = 0
+        self._alive = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._trained_at = 0
+        self._training = False
+        self._layout = 0  # bumped by _compact, which renumbers rows
+        self._lock = threading.RLock()
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= len(self._vectors):
+            return
+        capacity = max(needed, 2 * len(self._vectors), 1024)
+        vectors = np.zeros((capacity, self._dim), dtype=np.float16)
+        vectors[:self._size] = self._vectors[:self._size]
+        chunk_ids = np.zeros(capacity, dtype=np.int32)
+        chunk_ids[:self._size] = self._row_chunk[:self._size]
+        self._vectors, self._row_chunk = vectors, chunk_ids
+
+    def add(self, document_id: str, embeddings: np.ndarray):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or len(embeddings) == 0:
+            return
+        with self._lock:
+            self.remove(document_id)
+            if self._dim is None:
+                self._dim = embeddings.shape[1]
+                self._vectors = np.zeros((0, self._dim), dtype=np.float16)
+            self._reserve(len(embeddings))
+            rows = list(range(self._size, self._size + len(embeddings)))
+            self._vectors[rows[0]:rows[-1] + 1] = embeddings
+            self._row_chunk[rows[0]:rows[-1] + 1] = np.arange(len(embeddings))
+            self._row_doc.extend([document_id] * len(embeddings))
+            self._doc_rows[document_id] = rows
+            self._size += len(embeddings)
+            self._alive += len(embeddings)
+
+            if self._centroids is not None:
+                assign = np.argmax(embeddings @ self._centroids.T, axis=1)
+                for row, bucket in zip(rows, assign):
+                    self._lists[bucket].append(row)
+            if self._alive >= self.min_train and self._alive >= self.retrain_factor * self._trained_at:
+                self._start_training()
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._doc_rows
+
+    def remove(self, document_id: str):
+        with self._lock:
+            rows = self._doc_rows.pop(document_id, None)
+            if not rows:
+                return
+            for row in rows:
+                self._row_doc[row] = None
+            self._alive -= len(rows)
+            # Deleted rows stay in their buckets as tombstones (skipped at query
+            # time) and are reclaimed once they make up most of the index.
+            if self._size > 1024 and self._alive < self._size // 2:
+                self._compact()
+
+    def _compact(self):
+        keep = [r for r in range(self._size) if self._row_doc[r] is not None]
+        remap = {old: new for new, old in enumerate(keep)}
+        self._vectors = self._vectors[keep].copy()
+        self._row_chunk = self._row_chunk[keep].copy()
+        self._row_doc = [self._row_doc[r] for r in keep]
+        self._doc_rows = {d: [remap[r] for r in rows] for d, rows in self._doc_rows.items()}
+        self._lists = [[remap[r] for r in bucket if r in remap] for bucket in self._lists]
+        self._size = len(keep)
+        self._layout += 1
+
+    def _start_training(self):
+        """Snapshot the live rows and train on a background thread (caller holds the lock)."""
+        if self._training:
+            return
+        self._training = True
+        live = np.array([r for r in range(self._size) if self._row_doc[r] is not None])
+        threading.Thread(
+            target=self._train, args=(self._vectors, live, self._size, self._layout),
+            name="legalease-ivf-train", daemon=True,
+        ).start()
+
+    def _train(self, vectors: np.ndarray, live: np.ndarray, size: int, layout: int,
+               iterations: int = 10, max_sample: int = 20000):
+        """
+        Spherical k-means over (a sample of) the snapshot's live vectors and
+        re-bucketing of those rows, without the lock: rows below `size` of the
+        snapshot array are never written again. Only swapping the result in,
+        and bucketing rows added meanwhile, happens under the lock.
+        """
+        try:
+            nlist = max(1, int(np.sqrt(len(live))))
+            rng = np.random.default_rng(0)
+            sample = live if len(live) <= max_sample else rng.choice(live, max_sample, replace=False)
+            x = vectors[sample].astype(np.float32)
+            centroids = x[rng.choice(len(x), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assign = np.argmax(x @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, x)
+                norms = LA.norm(sums, axis=1, keepdims=True)
+                nonempty = norms[:, 0] > 0
+                centroids[nonempty] = sums[nonempty] / norms[nonempty]
+
+            lists = [[] for _ in range(nlist)]
+            for start in range(0, len(live), 8192):
+                rows = live[start:start + 8192]
+                assign = np.argmax(vectors[rows].astype(np.float32) @ centroids.T, axis=1)
+                for row, bucket in zip(rows.tolist(), assign.tolist()):
+                    lists[bucket].append(row)
+
+            with self._lock:
+                if layout != self._layout:
+                    return  # compacted meanwhile, so row numbers changed; the next add retrains
+                added = [r for r in range(size, self._size) if self._row_doc[r] is not None]
+                if added:
+                    assign = np.argmax(self._vectors[added].astype(np.float32) @ centroids.T, axis=1)
+                    for row, bucket in zip(added, assign.tolist()):
+                        lists[bucket].append(row)
+                # Rows deleted since the snapshot stay as tombstones, as after any remove
+                self._centroids, self._lists = centroids, lists
+                self._trained_at = len(live)
+        except Exception:
+            logger.exception("IVF training failed")
+        finally:
+            with self._lock:
+                self._training = False
+
+    def search(self, query_embedding: np.ndarray, top_k: int = 5) -> List[Tuple[str, int, float]]:
+        """Return (document_id, chunk_id, score) for the best `top_k` chunks in the corpus."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        with self._lock:
+            if self._alive == 0:
+                return []
+            if self._centroids is None:
+                rows = np.array([r for r in range(self._size) if self._row_doc[r] is not None])
+            else:
+                centroid_scores = self._centroids @ query
+                nprobe = min(self.nprobe, len(self._centroids))
+                probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+                rows = np.array(
+                    [r for bucket in probe for r in self._lists[bucket] if self._row_doc[r] is not None],
+                    dtype=np.int64,
+                )
+                if rows.size == 0:
+                    return []
+            scores = self._vectors[rows].astype(np.float32) @ query
+            k = min(top_k, len(rows))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [
+                (self._row_doc[rows[i]], int(self._row_chunk[rows[i]]), float(scores[i]))
+                for i in best
+            ]
+
+    def nbytes(self) -> int:
+        """Allocated bytes of the vector, row and centroid arrays."""
+        # No lock: DOC_STORE calls this while holding its own, and each read is atomic
+        centroids = self._centroids
+        return self._vectors.nbytes + self._row_chunk.nbytes + (0 if centroids is None else centroids.nbytes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "vectors": self._alive,
+                "lists": len(self._lists) if self._centroids is not None else 0,
+                "trained": self._centroids is not None,
+                "training": self._training,
+                "bytes": self.nbytes(),
+            }
+
+
+CORPUS_INDEX = CorpusIndex(
+    min_train=int(os.getenv("LEGALEASE_IVF_MIN_TRAIN", "2048")),
+    nprobe=int(os.getenv("LEGALEASE_IVF_NPROBE", "16")),
+)
+EMBED_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+# "onnx" / "onnx-int8" are opt-in: enable one only after
+# `python -m benchmarks.bench_embed_backends --min-cosine 0.99` passes on the target install
+EMBED_BACKEND = os.getenv("LEGALEASE_EMBED_BACKEND", "torch")
+EMBED_MODEL = LazyModel("embedder", functools.partial(load_embed_model, EMBED_MODEL_NAME, EMBED_BACKEND))
+EMBED_BATCH_SIZE = int(os.getenv("LEGALEASE_EMBED_BATCH_SIZE", "64"))
+# Precision of the in-memory chunk embeddings: float32, float16 or int8 (per-vector scale).
+# With EMBED_RESCORE on, a full-precision copy is kept memory-mapped on disk and
+# the top EMBED_RESCORE_FACTOR * top_k candidates are rescored against it.
+EMBED_STORAGE = os.getenv("LEGALEASE_EMBED_STORAGE", "float16")
+EMBED_RESCORE = os.getenv("LEGALEASE_EMBED_RESCORE", "1") != "0"
+EMBED_RESCORE_FACTOR = int(os.getenv("LEGALEASE_EMBED_RESCORE_FACTOR", "4"))
+if EMBED_STORAGE not in ("float32", "float16", "int8"):
+    raise ValueError(f"LEGALEASE_EMBED_STORAGE must be float32, float16 or int8, got {EMBED_STORAGE!r}")
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class QuestionEmbeddingCache:
+    """Bounded LRU of normalized question embeddings, keyed by normalized question text."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        # The model is uncased, so case and spacing never change the embedding
+        return " ".join(question.lower().split())
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+            return embedding
+
+    def put(self, key: str, embedding: np.ndarray):
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+QUESTION_CACHE = QuestionEmbeddingCache(int(os.getenv("LEGALEASE_QUESTION_CACHE_SIZE", "1024")))
+
+
+class EmbeddingBatcher:
+    """
+    Single scheduler thread that owns all SentenceTransformer inference.
+    Callers (any thread) queue texts and block on a future; the scheduler takes
+    the first waiting request, gathers more for up to `max_wait_ms` or until
+    `max_batch` texts, runs one forward pass and hands each caller its rows.
+    Question lookups (priority 0) are served ahead of indexing (priority 1).
+    """
+
+    QUERY = 0
+    INDEX = 1
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # Lazily, and again in a forked child, where the parent's thread doesn't exist
+        if self._thread is None or self._pid != os.getpid():
+            with self._lock:
+                if self._thread is None or self._pid != os.getpid():
+                    self._queue = queue.PriorityQueue()
+                    self._thread = threading.Thread(target=self._loop, name="legalease-embed", daemon=True)
+                    self._pid = os.getpid()
+                    self._thread.start()
+
+    def encode(self, texts: List[str], priority: int = INDEX) -> np.ndarray:
+        """Normalized embeddings of `texts`, computed in a shared batch."""
+        if not texts:
+            return np.zeros((0, EMBED_MODEL.get().get_sentence_embedding_dimension()), dtype=np.float32)
+        self._ensure_started()
+        future: Future = Future()
+        with self._lock:
+            self._seq += 1
+            self._queue.put((priority, self._seq, list(texts), future))
+        return future.result()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            if batch[0][2] is None:
+                return
+            size = len(batch[0][2])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item[2] is None or size + len(item[2]) > self.max_batch:
+                    self._queue.put(item)  # shutdown, or doesn't fit: first in the next batch
+                    break
+                batch.append(item)
+                size += len(item[2])
+            self._run(batch, size)
+
+    def _run(self, batch: list, size: int):
+        texts = [text for _, _, item_texts, _ in batch for text in item_texts]
+        EMBED_BATCH_SIZES.observe(size, "coalesced")
+        try:
+            embeddings = EMBED_MODEL.get().encode(
+                texts, batch_size=max(EMBED_BATCH_SIZE, len(texts)), normalize_embeddings=True
+            )
+        except Exception as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+        offset = 0
+        for _, _, item_texts, future in batch:
+            future.set_result(np.asarray(embeddings[offset:offset + len(item_texts)]))
+            offset += len(item_texts)
+
+    def shutdown(self):
+        if self._thread is not None and self._pid == os.getpid():
+            self._queue.put((2, 0, None, None))  # sorts after all real work
+
+
+EMBED_BATCHER = EmbeddingBatcher(
+    int(os.getenv("LEGALEASE_EMBED_MAX_BATCH", "64")),
+    float(os.getenv("LEGALEASE_EMBED_MAX_WAIT_MS", "2")),
+)
+
+
+def embed_questions(questions: List[str]) -> Tuple[np.ndarray, List[bool]]:
+    """
+    Return (normalized embeddings, cache_hit per question) for questions or
+    search queries. Cache misses are encoded together in one forward pass.
+    """
+    keys = [QUESTION_CACHE.normalize(question) for question in questions]
+    cached = [QUESTION_CACHE.get(key) for key in keys]
+    misses = list(dict.fromkeys(key for key, embedding in zip(keys, cached) if embedding is None))
+    encoded = {}
+    if misses:
+        EMBED_BATCH_SIZES.observe(len(misses), "question")
+        for key, embedding in zip(misses, EMBED_BATCHER.encode(misses, EmbeddingBatcher.QUERY)):
+            embedding = embedding.copy()
+            embedding.setflags(write=False)  # shared between requests
+            QUESTION_CACHE.put(key, embedding)
+            encoded[key] = embedding
+    for embedding in cached:
+        QUESTION_CACHE_LOOKUPS.inc("miss" if embedding is None else "hit")
+    rows = [embedding if embedding is not None else encoded[key] for key, embedding in zip(keys, cached)]
+    return np.stack(rows), [embedding is not None for embedding in cached]
+
+
+def embed_question(question: str) -> Tuple[np.ndarray, bool]:
+    """Return (normalized embedding, cache_hit) for a question or search query."""
+    embeddings, hits = embed_questions([question])
+    return embeddings[0], hits[0]
+# ---------------------------------------------------------------------------
+# Metrics, exposed at /metrics in the Prometheus text format. Recording is a
+# lock, a bisect and two additions, so it is cheap enough for the /ask path.
+# Stages that run in CPU_POOL processes are timed in the parent (or report
+# their timings back), since child-process metrics would be lost.
+# ---------------------------------------------------------------------------
+
+METRICS: List = []  # every Counter/Histogram, in creation order, for /metrics
+
+
+def _label_str(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                labels = _label_str(self.labels, values)
+                lines.append(f"{self.name}{{{labels}}} {total}" if labels else f"{self.name} {total}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float], labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labels = labels
+        self._series: Dict[Tuple[str, ...], list] = {}  # per-bucket counts (+Inf last), then sum
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def observe(self, value: float, *label_values: str):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def time(self, *label_values: str) -> "_Timer":
+        return _Timer(self, label_values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted((k, list(v)) for k, v in self._series.items())
+        for values, series in series_items:
+            labels = _label_str(self.labels, values)
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for le, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le_text = "+Inf" if le == float("inf") else repr(le)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le_text}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-1]}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class _Timer:
+    """`with HISTOGRAM.time(labels...):` observes the elapsed seconds of the block."""
+
+    __slots__ = ("histogram", "label_values", "started")
+
+    def __init__(self, histogram: Histogram, label_values: Tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+        return False
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+STAGE_SECONDS = Histogram(
+    "legalease_stage_seconds", "Latency of each pipeline stage.", LATENCY_BUCKETS, ("endpoint", "stage"),
+)
+EMBED_BATCH_SIZES = Histogram(
+    "legalease_embed_batch_size", "Number of texts per embedding-model encode call.",
+    (1, 2, 4, 8, 16, 32, 64, 128, 256), ("caller",),
+)
+ANSWERS = Counter("legalease_answers_total", "/ask answers by path.", ("path",))
+QUESTION_CACHE_LOOKUPS = Counter("legalease_question_cache_total", "Question embedding cache lookups.", ("result",))
+ANALYSES = Counter("legalease_analyses_total", "Analyzed documents by content-cache outcome.", ("endpoint", "cache"))
+TTS_JOBS = Counter("legalease_tts_jobs_total", "Finished TTS jobs.", ("backend", "status"))
+PDF_PAGES = Counter("legalease_pdf_pages_total", "Pages extracted by /analyze, by outcome.", ("status",))
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def render_gauges() -> List[str]:
+    """Point-in-time gauges, computed at scrape time."""
+    store = DOC_STORE.stats()
+    corpus = CORPUS_INDEX.stats()
+    gauges = [
+        ("legalease_documents", "Indexed documents (resident + spilled).", store["resident"] + store["spilled"]),
+        ("legalease_documents_resident", "Documents held in memory.", store["resident"]),
+        ("legalease_doc_store_resident_bytes", "Estimated bytes of resident documents.", store["resident_bytes"]),
+        ("legalease_doc_store_budget_bytes", "DOC_STORE memory budget.", store["budget_bytes"]),
+        ("legalease_embedding_bytes_resident", "Bytes of in-memory (not memory-mapped) embedding arrays.",
+         store["embedding_bytes"]),
+        ("legalease_corpus_vectors", "Vectors in the cross-document ANN index.", corpus.get("vectors", 0)),
+        ("legalease_corpus_index_bytes", "Bytes held by the cross-document ANN index.", corpus.get("bytes", 0)),
+        ("legalease_models_ready", "1 once models are loaded and warmed.", int(READINESS.ready)),
+        ("process_resident_memory_bytes", "Resident set size of the worker that served this scrape.",
+         process_rss_bytes()),
+    ]
+    lines = []
+    for name, help_text, value in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+BATCH_MAX_FILES = int(os.getenv("LEGALEASE_BATCH_MAX_FILES", "500"))
+NLP_BATCH_SIZE = int(os.getenv("LEGALEASE_NLP_BATCH_SIZE", "8"))
+NLP_N_PROCESS = int(os.getenv("LEGALEASE_NLP_N_PROCESS", "1"))
+
+
+class BoundedPool:
+    """Executor wrapper that rejects new work with 429 once `max_pending` jobs are queued or running."""
+
+    def __init__(self, name: str, executor: Executor, max_pending: int):
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=429,
+                detail=f"Server busy ({self.name} pool saturated), please retry shortly",
+            )
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # Release on completion, not when the caller stops waiting, so a
+        # disconnected client can't free a slot that is still doing work.
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Execution layer: blocking stages must never run on the event loop.
+#   CPU_POOL   - processes for pure-Python CPU work (PyPDF2 parsing, spaCy, regex extraction)
+#   IO_POOL    - threads for I/O-bound or GIL-releasing work (embedding during indexing)
+#   QUERY_POOL - threads reserved for /ask so questions never queue behind analyses
+CPU_WORKERS = int(os.getenv("LEGALEASE_CPU_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+IO_WORKERS = int(os.getenv("LEGALEASE_IO_WORKERS", "8"))
+QUERY_WORKERS = int(os.getenv("LEGALEASE_QUERY_WORKERS", "4"))
+# forkserver: workers are not forked from this (by then multi-threaded) process.
+# Windows has neither fork nor forkserver, so it falls back to spawn.
+CPU_START_METHOD = os.getenv(
+    "LEGALEASE_CPU_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+
+def _warm_worker(own_import: bool):
+    """CPU_POOL initializer: load spaCy and run one dummy pass before the worker takes real work."""
+    if own_import:
+        # This worker imported main itself and never uses DOC_STORE; drop the spill dir that import made
+        DOC_STORE.close()
+    if WARMUP_ON_STARTUP:
+        try:
+            NER_MODEL.get()
+            extract_entities(WARMUP_TEXT)
+        except Exception:
+            # An initializer error would break the pool; the model loads on first use instead
+            logger.exception("CPU worker warmup failed")
+
+
+CPU_POOL = BoundedPool(
+    "cpu", ProcessPoolExecutor(
+        max_workers=CPU_WORKERS, mp_context=multiprocessing.get_context(CPU_START_METHOD),
+        initializer=_warm_worker, initargs=(CPU_START_METHOD != "fork",),
+    ),
+    int(os.getenv("LEGALEASE_CPU_QUEUE", str(CPU_WORKERS * 4))),
+)
+IO_POOL = BoundedPool(
+    "io", ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="legalease-io"),
+    int(os.getenv("LEGALEASE_IO_QUEUE", str(IO_WORKERS * 4))),
+)
+QUERY_POOL = BoundedPool(
+    "query", ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="legalease-query"),
+    int(os.getenv("LEGALEASE_QUERY_QUEUE", str(QUERY_WORKERS * 16))),
+)
+
+
+class GTTSBackend:
+    """Google Translate TTS (remote call)."""
+    name = "gtts"
+    extension = "mp3"
+
+    def synthesize(self, text: str, lang: str, path: str) -> None:
+        gTTS(text=text, lang=lang, slow=False).save(path)
+
+
+class EspeakBackend:
+    """Local, offline synthesis through the espeak-ng command line tool."""
+    name = "espeak"
+    extension = "wav"
+
+    def synthesize(self, text: str, lang: str, path: str) -> None:
+        subprocess.run(["espeak-ng", "-v", lang, "-w", path, text], check=True, capture_output=True, timeout=120)
+
+
+class StubTTSBackend:
+    """Writes a short silent WAV without any synthesis; for tests and benchmarks."""
+    name = "stub"
+    extension = "wav"
+
+    def synthesize(self, text: str, lang: str, path: str) -> None:
+        with wave.open(path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(8000)
+            out.writeframes(b"\x00\x00" * 800)
+
+
+TTS_BACKENDS = {
+    "gtts": GTTSBackend,
+    "espeak": EspeakBackend,
+    "stub": StubTTSBackend,
+}
+
+
+class AudioJobs:
+    """
+    Background queue for Tamil summary audio.
+    Audio is content-addressed by (backend, language, text), so identical summaries
+    are synthesized once and later requests reuse the file. Status is tracked per
+    audio_id and exposed through /audio/status/{audio_id}.
+
+    The job table is bounded (finished jobs expire after `ttl_seconds` and the
+    oldest are dropped beyond `max_jobs`); status of a job this process doesn't
+    know is read from AUDIO_DIR, so any worker can answer for any job:
+    <file> means done, <file>.part running and <file>.failed failed.
+    """
+
+    # A .part file this old is left over from a crashed process, not a running job
+    STALE_PART_SECONDS = 600
+
+    def __init__(self, backend, audio_dir: str, workers: int, max_jobs: int = 1024, ttl_seconds: float = 3600):
+        self.backend = backend
+        self.audio_dir = audio_dir
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="legalease-tts")
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def audio_id(self, text: str, lang: str) -> str:
+        key = f"{self.backend.name}\0{lang}\0{text}".encode("utf-8")
+        return hashlib.sha256(key).hexdigest()[:32]
+
+    def filename(self, audio_id: str) -> str:
+        return f"{audio_id}.{self.backend.extension}"
+
+    def _path(self, audio_id: str) -> str:
+        return os.path.join(self.audio_dir, self.filename(audio_id))
+
+    def _disk_status(self, audio_id: str) -> Optional[dict]:
+        path = self._path(audio_id)
+        if os.path.exists(path):
+            return {"status": "done", "error": None}
+        try:
+            with open(f"{path}.failed", encoding="utf-8") as f:
+                return {"status": "failed", "error": f.read()}
+        except OSError:
+            pass
+        try:
+            if time.time() - os.path.getmtime(f"{path}.part") < self.STALE_PART_SECONDS:
+                return {"status": "running", "error": None}
+        except OSError:
+            pass
+        return None
+
+    def _claim(self, audio_id: str) -> bool:
+        """Create <file>.part exclusively, so only one process on the host synthesizes this audio."""
+        part_path = f"{self._path(audio_id)}.part"
+        for _ in range(2):
+            try:
+                os.close(os.open(part_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(part_path) < self.STALE_PART_SECONDS:
+                        return False
+                    os.remove(part_path)
+                except OSError:
+                    pass
+        return False
+
+    def _prune(self):
+        """Drop expired finished jobs, then the oldest finished ones beyond max_jobs (caller holds the lock)."""
+        now = time.monotonic()
+        for audio_id, job in list(self._jobs.items()):
+            finished_at = job.get("finished_at")
+            if finished_at is not None and (now - finished_at > self.ttl_seconds or len(self._jobs) > self.max_jobs):
+                del self._jobs[audio_id]
+
+    def submit(self, text: str, lang: str = "ta") -> dict:
+        """Queue synthesis unless the audio already exists or is in progress; returns the job status."""
+        audio_id = self.audio_id(text, lang)
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(audio_id)
+            if job is None or job["status"] == "failed":
+                on_disk = self._disk_status(audio_id)
+                if on_disk is not None and on_disk["status"] == "done":
+                    self._jobs[audio_id] = {**on_disk, "finished_at": time.monotonic()}
+                elif (on_disk is None or on_disk["status"] == "failed") and self._claim(audio_id):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(f"{self._path(audio_id)}.failed")
+                    self._jobs[audio_id] = {"status": "pending", "error": None}
+                    self._jobs[audio_id]["future"] = self.executor.submit(self._run, audio_id, text, lang)
+                # Otherwise another process is synthesizing it; status comes from disk
+            if audio_id in self._jobs:
+                self._jobs.move_to_end(audio_id)
+        return self.status(audio_id)
+
+    async def wait(self, audio_id: str, timeout: float) -> Optional[dict]:
+        """Status once the job has finished, or as it stands after `timeout` seconds."""
+        future = self._jobs.get(audio_id, {}).get("future")
+        if future is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.status(audio_id)
+
+    def _run(self, audio_id: str, text: str, lang: str):
+        job = self._jobs[audio_id]
+        job["status"] = "running"
+        path = self._path(audio_id)
+        # Written under the claimed .part name so /audio never serves a partial file
+        part_path = f"{path}.part"
+        try:
+            with STAGE_SECONDS.time("audio", f"tts_{self.backend.name}"):
+                self.backend.synthesize(text, lang, part_path)
+            os.replace(part_path, path)
+            job["status"] = "done"
+        except Exception as e:
+            tmp_path = f"{path}.failed.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(e))
+            os.replace(tmp_path, f"{path}.failed")
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(part_path)
+            job.update(status="failed", error=str(e))
+        job["finished_at"] = time.monotonic()
+        TTS_JOBS.inc(self.backend.name, job["status"])
+
+    def status(self, audio_id: str) -> Optional[dict]:
+        job = self._jobs.get(audio_id)
+        if job is None:
+            # Not tracked here (restart, other worker, expired) but may be on disk
+            job = self._disk_status(audio_id)
+            if job is None:
+                return None
+        return {
+            "audio_id": audio_id,
+            "status": job["status"],
+            "error": job["error"],
+            "url": f"/audio/{self.filename(audio_id)}",
+            "status_url": f"/audio/status/{audio_id}",
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        # Release the claims of queued jobs that will now never run
+        for audio_id, job in list(self._jobs.items()):
+            future = job.get("future")
+            if future is not None and future.cancelled():
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(f"{self._path(audio_id)}.part")
+
+
+AUDIO_JOBS = AudioJobs(
+    TTS_BACKENDS[os.getenv("LEGALEASE_TTS_BACKEND", "gtts")](),
+    AUDIO_DIR,
+    workers=int(os.getenv("LEGALEASE_TTS_WORKERS", "2")),
+    max_jobs=int(os.getenv("LEGALEASE_TTS_JOBS_MAX", "1024")),
+    ttl_seconds=float(os.getenv("LEGALEASE_TTS_JOBS_TTL", "3600")),
+)
+
+
+def audio_response(audio_status: dict) -> dict:
+    return {
+        "tamil_summary_mp3_url": audio_status["url"],
+        "audio_id": audio_status["audio_id"],
+        "status": audio_status["status"],
+        "status_url": audio_status["status_url"],
+    }
+
+
+class Readiness:
+    """Startup phase timings and whether the models are loaded and warmed."""
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+
+    def phase(self, name: str, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.phases[name] = round(time.perf_counter() - start, 3)
+        logger.info("startup phase %s took %.2fs", name, self.phases[name])
+        return result
+
+
+READINESS = Readiness()
+# Set to 0 to skip warmup; models then load on the first request that needs them
+WARMUP_ON_STARTUP = os.getenv("LEGALEASE_WARMUP", "1") != "0"
+WARMUP_TEXT = "This sale deed is executed at Chennai District, Tamil Nadu on 01-01-2024 between Mr. Raman and Ms. Lakshmi."
+
+
+def warm_cpu_pool():
+    """Start every CPU_POOL worker and wait until each one has finished its _warm_worker initializer."""
+    warm = set()
+    while True:
+        # A worker takes tasks only once its initializer is done, so every pid seen is warm
+        warm.update(f.result() for f in [CPU_POOL.submit(os.getpid) for _ in range(CPU_WORKERS)])
+        if len(warm) >= CPU_WORKERS:
+            return
+        time.sleep(0.05)
+
+
+def warmup_models():
+    """
+    Load both models, run one dummy NER pass and one dummy encode through them,
+    and warm NER in every CPU_POOL worker.
+    """
+    try:
+        READINESS.phase("load_ner", NER_MODEL.get)
+        READINESS.phase("warmup_ner", lambda: extract_entities(WARMUP_TEXT))
+        READINESS.phase("warmup_cpu_pool", warm_cpu_pool)
+        READINESS.phase("load_embedder", EMBED_MODEL.get)
+        READINESS.phase("warmup_embedder", lambda: EMBED_MODEL.get().encode([WARMUP_TEXT], normalize_embeddings=True))
+        READINESS.ready = True
+        logger.info("ready after %.2fs", time.perf_counter() - _MODULE_STARTED)
+    except Exception as e:
+        READINESS.error = str(e)
+        logger.exception("model warmup failed")
+
+
+@app.on_event("startup")
+def start_warmup():
+    READINESS.phases["module_init"] = round(time.perf_counter() - _MODULE_STARTED, 3)
+    logger.info("startup phase module_init took %.2fs", READINESS.phases["module_init"])
+    if WARMUP_ON_STARTUP:
+        # Off the event loop so /healthz answers while the models load
+        threading.Thread(target=warmup_models, name="legalease-warmup", daemon=True).start()
+    else:
+        READINESS.ready = True
+
+
+@app.on_event("shutdown")
+def shutdown_pools():
+    for pool in (CPU_POOL, IO_POOL, QUERY_POOL):
+        pool.shutdown()
+    AUDIO_JOBS.shutdown()
+    EMBED_BATCHER.shutdown()
+    DOC_STORE.close()
 
 
 def py(v):
@@ -43,90 +1491,366 @@ def py(v):
     return v
 
 
-def extract_text_from_pdf(path: str) -> str:
+# Page-level extraction. Large PDFs are split into page ranges that CPU_POOL
+# workers extract concurrently (extract_pdf_pages_parallel); every page gets
+# its own deadline and error handling, so one pathological page costs at most
+# PDF_PAGE_TIMEOUT seconds and comes back as an empty page instead of failing
+# the document.
+PDF_PAGE_TIMEOUT = float(os.getenv("LEGALEASE_PDF_PAGE_TIMEOUT", "20"))
+PDF_PAGES_PER_TASK = int(os.getenv("LEGALEASE_PDF_PAGES_PER_TASK", "16"))
+
+
+class PageTimeout(Exception):
+    pass
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def extract_page_text(page, timeout: float = PDF_PAGE_TIMEOUT) -> str:
+    """
+    page.extract_text() with a SIGALRM deadline. The alarm needs the main
+    thread of a POSIX process (true in CPU_POOL workers); elsewhere the page
+    runs without a deadline.
+    """
+    if timeout <= 0 or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return page.extract_text() or ""
+    previous = signal.signal(signal.SIGALRM, _raise_page_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return page.extract_text() or ""
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def extract_pdf_page_range(path: str, start: int, stop: int,
+                           timeout: float = PDF_PAGE_TIMEOUT) -> List[Tuple[str, Optional[str]]]:
+    """(text, error) for pages [start, stop); a failed or timed-out page is ("", reason)."""
+    pages = PdfReader(path).pages
+    results = []
+    for number in range(start, min(stop, len(pages))):
+        try:
+            results.append((extract_page_text(pages[number], timeout), None))
+        except PageTimeout:
+            results.append(("", f"timed out after {timeout:g}s"))
+        except Exception as e:
+            results.append(("", f"{type(e).__name__}: {e}"))
+    return results
+
+
+def pdf_page_count(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def pdf_page_ranges(page_count: int, parts: int, min_pages: int = PDF_PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    """Split pages into at most `parts` contiguous ranges of at least `min_pages` pages (except the last)."""
+    if page_count <= 0:
+        return []
+    parts = max(1, min(parts, -(-page_count // max(1, min_pages))))
+    size = -(-page_count // parts)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _log_page_errors(path: str, results: List[Tuple[str, Optional[str]]]) -> List[str]:
+    for number, (_, error) in enumerate(results, start=1):
+        if error:
+            logger.warning("page %d of %s could not be extracted: %s", number, path, error)
+    return [text for text, _ in results]
+
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """Yield the text of each page lazily instead of materializing the whole document."""
     reader = PdfReader(path)
-    pages = []
-    for page in reader.pages:
-        pages.append(page.extract_text() or "")
-    return "\n".join(pages)
+    for number, page in enumerate(reader.pages, start=1):
+        try:
+            yield extract_page_text(page)
+        except PageTimeout:
+            logger.warning("page %d of %s timed out after %gs", number, path, PDF_PAGE_TIMEOUT)
+            yield ""
+        except Exception as e:
+            logger.warning("page %d of %s could not be extracted: %s", number, path, e)
+            yield ""
+
+
+def extract_pdf_pages(path: str) -> List[str]:
+    return list(iter_pdf_pages(path))
+
+
+def extract_text_from_pdf(path: str) -> str:
+    return "\n".join(iter_pdf_pages(path))
+
+
+# ---------------------------------------------------------------------------
+# Fact-extraction engine
+#
+# All patterns are compiled once. scan_facts makes a bounded number of linear
+# passes over the text and emits (label, value, start, end) matches; the
+# extract_* helpers below only read those matches. The engine reproduces the
+# results of the original per-field re.search calls, including the
+# BETWEEN/AND fallbacks, whose DOTALL `.*?\n` form could backtrack
+# quadratically on long texts with many "and"s and no match.
+# ---------------------------------------------------------------------------
+
+_NAME_JUNK_RE = re.compile(r'[^A-Za-z.\s]')
+_WS_COLLAPSE_RE = re.compile(r'\s+')
+_WS_RUN_RE = re.compile(r'\s*')
+_TITLE_RE = re.compile(r'Mr\.|Ms\.|Mrs\.', re.IGNORECASE)
+_NAME_RUN_RE = re.compile(r'[A-Za-z .]*', re.IGNORECASE)
+_LINE_REST_RE = re.compile(r'[^\n\r]*')
+_ALPHA_WS_RE = re.compile(r'[A-Za-z\s]', re.IGNORECASE)
+_ROLE_HEADING_RE = re.compile(r'VENDOR|SELLER|PURCHASER|BUYER', re.IGNORECASE)
+_BETWEEN_RE = re.compile(r'(BETWEEN)\s+', re.IGNORECASE)
+_AND_RE = re.compile(r'\b(AND)\b\s+', re.IGNORECASE)
+_PROPERTY_LABEL_RE = re.compile(r'Survey No|Patta No|Village|Taluk|District', re.IGNORECASE)
+_DISTRICT_HEADER_RE = re.compile(r'District,\s*Tamil Nadu', re.IGNORECASE)
+_PROPERTY_TRAILER_RE = re.compile(r"\b(Taluk|District|BOUNDARIES)\b.*$", re.IGNORECASE)
+_DATE_RE = re.compile(r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b")
+_AMOUNT_RES = [
+    re.compile(r'Rs\.?\s*[\d,]+(?:\.\d+)?\s*/?-?', re.IGNORECASE),   # Rs. 25,00,000/-
+    re.compile(r'₹\s*[\d,]+(?:\.\d+)?', re.IGNORECASE),              # ₹25,00,000
+    # "Rupees ... Only" phrases were matched here too, but they contain no digits
+    # and so never passed the >= 1000 filter in extract_facts; dropped.
+    # The lookbehind makes a failed attempt skip the rest of a digit run
+    # instead of retrying from every position inside it (same matches).
+    re.compile(r'(?<![\d,])[\d,]+\s*Lakhs', re.IGNORECASE),          # 25 Lakhs / 25,00,000 style text
+]
+_PROPERTY_LABELS = {
+    "survey no": "survey_no",
+    "patta no": "patta_no",
+    "village": "village",
+    "taluk": "taluk",
+    "district": "district",
+}
+
+FactMatch = Tuple[str, str, int, int]   # (label, value, start, end)
 
 
 def _clean_name(name: str) -> str:
-    name = re.sub(r'[^A-Za-z.\s]', '', name).strip()
-    name = re.sub(r'\s+', ' ', name).strip()
+    name = _NAME_JUNK_RE.sub('', name).strip()
+    name = _WS_COLLAPSE_RE.sub(' ', name).strip()
     return name
 
 
-def extract_role_parties(text: str) -> dict:
+def _ws_end(text: str, pos: int) -> int:
+    return _WS_RUN_RE.match(text, pos).end()
+
+
+def _space_as_name(text: str, lo: int, hi: int, need_comma: bool) -> Optional[Tuple[str, int]]:
+    """
+    When the name run at `hi` is empty, the regex backtracks into the whitespace
+    in [lo, hi) and takes a single space as the "name".
+    """
+    if need_comma:
+        if hi - 1 >= lo and text[hi - 1] == " " and text.startswith(",", hi):
+            return " ", hi - 1
+        return None
+    space = text.rfind(" ", lo, hi)
+    return (" ", space) if space != -1 else None
+
+
+def _name_after_newline(text: str, nl: int, q: int, need_comma: bool) -> Optional[Tuple[str, int]]:
+    """
+    Equivalent of matching `\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+)` (plus a
+    trailing `,` when `need_comma`) at the newline `nl`, where `q` is the end of
+    the whitespace run after it. Returns (name, start) or None, without the
+    regex's quadratic backtracking over long whitespace runs.
+    """
+    title = _TITLE_RE.match(text, q)
+    if title:
+        r = _ws_end(text, title.end())
+        t = _NAME_RUN_RE.match(text, r).end()
+        if t > r and (not need_comma or text.startswith(",", t)):
+            return text[r:t], r
+        if t == r:
+            hit = _space_as_name(text, title.end(), r, need_comma)
+            if hit:
+                return hit
+    t = _NAME_RUN_RE.match(text, q).end()
+    if t > q and (not need_comma or text.startswith(",", t)):
+        return text[q:t], q
+    if t == q:
+        return _space_as_name(text, nl + 1, q, need_comma)
+    return None
+
+
+def _scan_role_headings(text: str, out: List[FactMatch]):
+    """Name on the line after the first VENDOR/SELLER and PURCHASER/BUYER heading that has one."""
+    found = set()
+    tried_lines = {}
+    nl = -1
+    for m in _ROLE_HEADING_RE.finditer(text):
+        label = "vendor" if m.group().upper() in ("VENDOR", "SELLER") else "purchaser"
+        if label in found:
+            continue
+        if nl < m.end():
+            nl = text.find("\n", m.end())
+            if nl == -1:
+                break
+        # The result depends only on the line break, not on where in the line the heading is
+        if nl not in tried_lines:
+            tried_lines[nl] = _name_after_newline(text, nl, _ws_end(text, nl + 1), need_comma=False)
+        hit = tried_lines[nl]
+        if hit:
+            name, start = hit
+            out.append((label, name, start, start + len(name)))
+            found.add(label)
+            if len(found) == 2:
+                break
+
+
+def _scan_block_party(text: str, marker_re, label: str, out: List[FactMatch]):
+    """
+    Linear equivalent of re.search(r'MARKER\s+.*?\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+),', DOTALL).
+    Only the first MARKER can match (later ones only see a subset of the same
+    line breaks), and line breaks inside one whitespace run share an outcome.
+    """
+    m = marker_re.search(text)
+    if not m:
+        return
+    ws_start, ws_end = m.end(1), m.end()
+    nl = text.find("\n", ws_end)
+    while nl != -1:
+        q = _ws_end(text, nl + 1)
+        hit = _name_after_newline(text, nl, q, need_comma=True)
+        if hit:
+            name, start = hit
+            out.append((label, name, start, start + len(name)))
+            return
+        nl = text.find("\n", q)
+    # Backtracking into the whitespace right after the marker
+    nl = text.rfind("\n", ws_start + 1, ws_end)
+    if nl != -1:
+        hit = _name_after_newline(text, nl, ws_end, need_comma=True)
+        if hit:
+            name, start = hit
+            out.append((label, name, start, start + len(name)))
+
+
+def _label_value(text: str, pos: int) -> Optional[Tuple[str, int]]:
+    """Equivalent of `\s*[:\-]?\s*([^\n\r]+)` matched at `pos`, as (value, start)."""
+    n = len(text)
+
+    def line_from(i: int) -> Tuple[str, int]:
+        return _LINE_REST_RE.match(text, i).group(), i
+
+    def last_inline_char(lo: int) -> Optional[Tuple[str, int]]:
+        for i in range(n - 1, lo - 1, -1):
+            if text[i] not in "\r\n":
+                return text[i], i
+        return None
+
+    a = _ws_end(text, pos)
+    if a < n and text[a] in ":-":
+        b = _ws_end(text, a + 1)
+        if b < n:
+            return line_from(b)
+        return last_inline_char(a + 1) or line_from(a)
+    if a < n:
+        return line_from(a)
+    return last_inline_char(pos)
+
+
+def _scan_property_labels(text: str, out: List[FactMatch]):
+    found = set()
+    for m in _PROPERTY_LABEL_RE.finditer(text):
+        label = _PROPERTY_LABELS[m.group().lower()]
+        if label in found:
+            continue
+        hit = _label_value(text, m.end())
+        if hit:
+            value, start = hit
+            out.append((label, value, start, start + len(value)))
+            found.add(label)
+            if len(found) == len(_PROPERTY_LABELS):
+                break
+
+
+def _scan_district_header(text: str, out: List[FactMatch]):
+    """Linear equivalent of re.search(r"([A-Za-z\s]+)\s+District,\s*Tamil Nadu", IGNORECASE)."""
+    run_floor = 0  # a run never extends back past the comma of an earlier candidate
+    for m in _DISTRICT_HEADER_RE.finditer(text):
+        d = m.start()
+        comma = d + len("District")
+        if d == 0 or not text[d - 1].isspace():
+            run_floor = comma + 1
+            continue
+        start = d - 1
+        while start > run_floor and _ALPHA_WS_RE.match(text, start - 1):
+            start -= 1
+        if d - start >= 2:
+            out.append(("district_header", text[start:d - 1], start, d - 1))
+            return
+        run_floor = comma + 1
+
+
+def scan_facts(text: str) -> List[FactMatch]:
+    """Run every fact pattern over `text` and return labeled matches with offsets."""
+    out: List[FactMatch] = []
+    _scan_role_headings(text, out)
+    _scan_block_party(text, _BETWEEN_RE, "between_party", out)
+    _scan_block_party(text, _AND_RE, "and_party", out)
+    _scan_property_labels(text, out)
+    _scan_district_header(text, out)
+    for m in _DATE_RE.finditer(text):
+        out.append(("date", m.group(), m.start(), m.end()))
+    for pattern in _AMOUNT_RES:
+        for m in pattern.finditer(text):
+            out.append(("amount", m.group(), m.start(), m.end()))
+    return out
+
+
+def _first_values(matches: List[FactMatch]) -> Dict[str, str]:
+    first: Dict[str, str] = {}
+    for label, value, _, _ in matches:
+        first.setdefault(label, value)
+    return first
+
+
+def extract_role_parties(text: str, matches: Optional[List[FactMatch]] = None) -> dict:
     """
     Try to extract Vendor and Purchaser style parties from typical Sale Deed format.
     Falls back to None if not found.
     """
-    # Capture line after VENDOR / PURCHASER headings
-    vendor = None
-    purchaser = None
-
-    vendor_match = re.search(
-        r'(VENDOR|SELLER)[^\n]*\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+)',
-        text,
-        flags=re.IGNORECASE
-    )
-    if vendor_match:
-        vendor = _clean_name(vendor_match.group(3))
+    first = _first_values(scan_facts(text) if matches is None else matches)
 
-    purchaser_match = re.search(
-        r'(PURCHASER|BUYER)[^\n]*\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+)',
-        text,
-        flags=re.IGNORECASE
-    )
-    if purchaser_match:
-        purchaser = _clean_name(purchaser_match.group(3))
+    # Capture line after VENDOR / PURCHASER headings
+    vendor = _clean_name(first["vendor"]) if "vendor" in first else None
+    purchaser = _clean_name(first["purchaser"]) if "purchaser" in first else None
 
     # If not found, try BETWEEN ... AND blocks
-    if not vendor:
-        between_vendor = re.search(
-            r'BETWEEN\s+.*?\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+),',
-            text,
-            flags=re.IGNORECASE | re.DOTALL
-        )
-        if between_vendor:
-            vendor = _clean_name(between_vendor.group(2))
-
-    if not purchaser:
-        between_purchaser = re.search(
-            r'\bAND\b\s+.*?\n\s*(Mr\.|Ms\.|Mrs\.)?\s*([A-Za-z .]+),',
-            text,
-            flags=re.IGNORECASE | re.DOTALL
-        )
-        if between_purchaser:
-            purchaser = _clean_name(between_purchaser.group(2))
+    if not vendor and "between_party" in first:
+        vendor = _clean_name(first["between_party"])
+    if not purchaser and "and_party" in first:
+        purchaser = _clean_name(first["and_party"])
 
     return {"vendor": vendor, "purchaser": purchaser}
 
 
-def extract_property_details(text: str) -> dict:
-    # Capture ONLY until newline (no spillover into next label)
+def extract_property_details(text: str, matches: Optional[List[FactMatch]] = None) -> dict:
+    first = _first_values(scan_facts(text) if matches is None else matches)
+
+    # Values were captured ONLY until newline (no spillover into next label)
     def first_line_value(label: str):
-        m = re.search(rf"{label}\s*[:\-]?\s*([^\n\r]+)", text, flags=re.IGNORECASE)
-        return m.group(1).strip() if m else None
+        return first[label].strip() if label in first else None
 
-    survey_no = first_line_value("Survey No")
-    patta_no = first_line_value("Patta No")
-    village = first_line_value("Village")
-    taluk = first_line_value("Taluk")
-    district = first_line_value("District")
+    survey_no = first_line_value("survey_no")
+    patta_no = first_line_value("patta_no")
+    village = first_line_value("village")
+    taluk = first_line_value("taluk")
+    district = first_line_value("district")
 
     # fallback: if District: line is missing/empty, use "X District, Tamil Nadu" from header
     if not district or district.strip() in {",", ", Tamil Nadu"}:
-        m = re.search(r"([A-Za-z\s]+)\s+District,\s*Tamil Nadu", text, flags=re.IGNORECASE)
-        if m:
-            district = m.group(1).strip()
+        if "district_header" in first:
+            district = first["district_header"].strip()
 
     # Extra cleanup: remove trailing label words if they got attached
     def clean(v: str | None):
         if not v:
             return None
-        v = re.sub(r"\b(Taluk|District|BOUNDARIES)\b.*$", "", v, flags=re.IGNORECASE).strip()
+        v = _PROPERTY_TRAILER_RE.sub("", v).strip()
         return v
 
     return {
@@ -138,12 +1862,62 @@ def extract_property_details(text: str) -> dict:
     }
 
 
-def extract_facts(text: str):
-    doc = nlp(text)
+def iter_ner_segments(text: str, max_chars: int = NER_SEGMENT_CHARS) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (offset, segment) pieces of at most `max_chars`, cut at paragraph or
+    line boundaries (pages are joined with newlines), falling back to whitespace.
+    """
+    start = 0
+    n = len(text)
+    while start < n:
+        end = min(start + max_chars, n)
+        if end < n:
+            for sep in ("\n\n", "\n", " "):
+                cut = text.rfind(sep, start + max_chars // 2, end)
+                if cut != -1:
+                    end = cut + len(sep)
+                    break
+        yield start, text[start:end]
+        start = end
+
+
+def extract_entities_batch(texts: List[str], batch_size: int = 8, n_process: int = 1) -> List[List[Tuple[str, str, int, int]]]:
+    """
+    Run NER over many texts and return (label, text, start, end) per entity,
+    with offsets relative to the original text. Every text is segmented and all
+    segments go through a single nlp.pipe call.
+    """
+    owners = []
+    offsets = []
+    segments = []
+    for i, text in enumerate(texts):
+        for offset, segment in iter_ner_segments(text):
+            owners.append(i)
+            offsets.append(offset)
+            segments.append(segment)
+
+    entities: List[List[Tuple[str, str, int, int]]] = [[] for _ in texts]
+    docs = NER_MODEL.get().pipe(segments, batch_size=batch_size, n_process=n_process)
+    for owner, offset, doc in zip(owners, offsets, docs):
+        entities[owner].extend(
+            (ent.label_, ent.text, offset + ent.start_char, offset + ent.end_char) for ent in doc.ents
+        )
+    return entities
+
+
+def extract_entities(text: str) -> List[Tuple[str, str, int, int]]:
+    return extract_entities_batch([text])[0]
+
+
+def extract_facts(text: str, entities: Optional[List[Tuple[str, str, int, int]]] = None):
+    if entities is None:
+        entities = extract_entities(text)
+
+    matches = scan_facts(text)
 
     # Parties
     parties = []
-    role_parties = extract_role_parties(text)
+    role_parties = extract_role_parties(text, matches)
     if role_parties["vendor"]:
         parties.append(role_parties["vendor"])
     if role_parties["purchaser"]:
@@ -154,34 +1928,26 @@ def extract_facts(text: str):
     amounts = []
 
     # A) Regex capture for dd-mm-yyyy / dd/mm/yyyy (numeric dates first)
-    date_matches = re.findall(r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b", text)
-    dates.extend(date_matches)
+    dates.extend(value for label, value, _, _ in matches if label == "date")
 
     # Amount detection (avoid picking pin codes / document numbers)
-    amount_patterns = [
-        r'Rs\.?\s*[\d,]+(?:\.\d+)?\s*/?-?',   # Rs. 25,00,000/-
-        r'₹\s*[\d,]+(?:\.\d+)?',              # ₹25,00,000
-        r'Rupees\s+[A-Za-z\s]+Only',          # Rupees Twenty Five Lakhs Only
-        r'[\d,]+\s*Lakhs',                    # 25 Lakhs / 25,00,000 style text
-    ]
-
-    for pattern in amount_patterns:
-        matches = re.findall(pattern, text, flags=re.IGNORECASE)
-        for match in matches:
-            # Keep only amounts that clearly look like money,
-            # and try to filter out small numbers
-            digits = re.sub(r'[^0-9]', '', match)
-            if digits.isdigit() and int(digits) >= 1000:
-                amounts.append(match.strip())
+    for label, match, _, _ in matches:
+        if label != "amount":
+            continue
+        # Keep only amounts that clearly look like money,
+        # and try to filter out small numbers
+        digits = re.sub(r'[^0-9]', '', match)
+        if digits.isdigit() and int(digits) >= 1000:
+            amounts.append(match.strip())
 
     # spaCy entities (fallback)
-    for ent in doc.ents:
-        if ent.label_ == "PERSON":
-            parties.append(ent.text)
-        elif ent.label_ == "DATE":
-            dates.append(ent.text)
-        elif ent.label_ == "MONEY":
-            amounts.append(ent.text)
+    for label, ent_text, _, _ in entities:
+        if label == "PERSON":
+            parties.append(ent_text)
+        elif label == "DATE":
+            dates.append(ent_text)
+        elif label == "MONEY":
+            amounts.append(ent_text)
 
     # Filter out obvious non-party noise
     bad_words = {
@@ -218,7 +1984,7 @@ def extract_facts(text: str):
     amounts = list(dict.fromkeys(amounts))[:4]
 
     # Property details
-    property_details = extract_property_details(text)
+    property_details = extract_property_details(text, matches)
 
     return {
         "parties": parties,
@@ -229,6 +1995,53 @@ def extract_facts(text: str):
     }
 
 
+def extract_facts_pages(pages: List[str], page_entities: Optional[List[Optional[list]]] = None
+                        ) -> Tuple[dict, List[list], Dict[str, float]]:
+    """
+    extract_facts over "\n".join(pages) with NER run page by page, so a later
+    version of the document can reuse the entities of its unchanged pages.
+    Pages whose `page_entities` item is not None skip NER. Returns the facts,
+    the per-page entities (page-relative offsets) and the seconds spent in
+    spaCy NER and in the regex engine (for /metrics).
+    """
+    started = time.perf_counter()
+    page_entities = list(page_entities) if page_entities is not None else [None] * len(pages)
+    todo = [i for i, ents in enumerate(page_entities) if ents is None]
+    if todo:
+        for i, ents in zip(todo, extract_entities_batch([pages[i] for i in todo])):
+            page_entities[i] = ents
+    ner_done = time.perf_counter()
+    facts = _facts_from_page_entities(pages, page_entities)
+    return facts, page_entities, {"ner": ner_done - started, "facts_regex": time.perf_counter() - ner_done}
+
+
+def _facts_from_page_entities(pages: List[str], page_entities: List[list]) -> dict:
+    entities = []
+    offset = 0
+    for page, ents in zip(pages, page_entities):
+        entities.extend((label, ent_text, offset + start, offset + end) for label, ent_text, start, end in ents)
+        offset += len(page) + 1
+    return extract_facts("\n".join(pages), entities)
+
+
+def extract_facts_batch(documents: List[List[str]], batch_size: int = 8, n_process: int = 1
+                        ) -> List[Tuple[dict, List[list]]]:
+    """
+    extract_facts_pages for many documents (each a list of pages), running
+    spaCy once over every page of the batch via nlp.pipe. Returns (facts,
+    page_entities) per document.
+    """
+    flat = [page for pages in documents for page in pages]
+    entities = extract_entities_batch(flat, batch_size=batch_size, n_process=n_process)
+    results = []
+    offset = 0
+    for pages in documents:
+        page_entities = entities[offset:offset + len(pages)]
+        offset += len(pages)
+        results.append((_facts_from_page_entities(pages, page_entities), page_entities))
+    return results
+
+
 def compute_risk_color(facts: dict):
     missing = []
     if len(facts.get("parties", [])) < 2:
@@ -348,21 +2161,35 @@ def full_tamil_summary(text: str, facts: dict, risk: dict) -> str:
     return tamil_summary
 
 
+@functools.lru_cache(maxsize=1024)
+def query_patterns(query: str) -> Tuple["re.Pattern", ...]:
+    """
+    Case-insensitive alternations to center snippets on, in priority order:
+    identifiers (terms with a digit, e.g. 123/4A), then meaningful words (longer than 3 chars).
+    """
+    identifiers = {t for t in _BM25_TOKEN_RE.findall(query.lower()) if any(ch.isdigit() for ch in t)}
+    q_words = {w.lower() for w in re.findall(r"[a-zA-Z]+", query) if len(w) > 3}
+    return tuple(
+        re.compile("|".join(map(re.escape, sorted(group, key=len, reverse=True))), re.IGNORECASE)
+        for group in (identifiers, q_words) if group
+    )
+
+
 def snippet_around(text: str, query: str, window: int = 260) -> str:
     """Extract a snippet around query keywords in the text."""
-    # Extract meaningful query words (longer than 3 chars)
-    q_words = [w.lower() for w in re.findall(r"[a-zA-Z]+", query) if len(w) > 3]
-    low = text.lower()
-    
-    # Find positions of query words in text
-    hits = [low.find(w) for w in q_words if low.find(w) != -1]
+    # The earliest match of an alternation is the earliest occurrence of any
+    # of its words, found in a single pass over the text
+    match = None
+    for pattern in query_patterns(query):
+        match = pattern.search(text)
+        if match is not None:
+            break
     
     # If no query words found, return beginning of text
-    if not hits:
+    if match is None:
         return text[:window] + ("..." if len(text) > window else "")
     
-    # Take the earliest occurrence
-    pos = min(hits)
+    pos = match.start()
     
     # Center snippet around the found position
     start = max(0, pos - window // 2)
@@ -379,46 +2206,422 @@ def snippet_around(text: str, query: str, window: int = 260) -> str:
         return text[start:end]
 
 
-def chunk_text(text: str, chunk_size: int = 160, overlap: int = 40) -> List[str]:
-    """Split text into overlapping chunks."""
+# Chunk windows are sized in embedding-model tokens, not words: anything past
+# the model's max_seq_length is silently truncated at encode time.
+# 0 means "the model's max_seq_length minus the [CLS]/[SEP] tokens".
+CHUNK_MAX_TOKENS = int(os.getenv("LEGALEASE_CHUNK_MAX_TOKENS", "0"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("LEGALEASE_CHUNK_OVERLAP_TOKENS", "48"))
+# Close the current chunk at every page end (the overlap tail still carries
+# into the next page). Chunk boundaries then depend only on the page itself and
+# the tail of the previous one, so an amended page leaves the chunks of the
+# other pages, and their embeddings, reusable (see reindex_document).
+CHUNK_PAGE_ALIGNED = os.getenv("LEGALEASE_CHUNK_PAGE_ALIGNED", "1") == "1"
+
+
+def chunk_token_budget() -> int:
+    return CHUNK_MAX_TOKENS or EMBED_MODEL.get().max_seq_length - 2
+
+
+def count_tokens(words: List[str]) -> List[int]:
+    """Wordpiece count of each word; whitespace-separated words tokenize independently."""
+    if not words:
+        return []
+    tokenizer = EMBED_MODEL.get().tokenizer
+    return [len(ids) for ids in tokenizer(words, add_special_tokens=False)["input_ids"]]
+
+
+def iter_chunks(pages: Iterable[str], max_tokens: Optional[int] = None,
+                overlap_tokens: int = CHUNK_OVERLAP_TOKENS, count=count_tokens,
+                page_aligned: bool = CHUNK_PAGE_ALIGNED) -> Iterator[Tuple[str, dict]]:
+    """
+    Stream overlapping chunks of at most `max_tokens` model tokens, page by page.
+    Yields (chunk text, meta) where meta holds the 1-based first/last page and
+    the character span of the chunk in "\n".join(pages).
+    """
+    max_tokens = max_tokens or chunk_token_budget()
+    window: deque = deque()   # (page, start, end, word, tokens)
+    tokens = 0
+    fresh = 0  # words not yet covered by an emitted chunk
+    offset = 0
+
+    def emit() -> Tuple[str, dict]:
+        return " ".join(w[3] for w in window), {
+            "page": window[0][0],
+            "page_end": window[-1][0],
+            "start": window[0][1],
+            "end": window[-1][2],
+            "tokens": tokens,
+        }
+
+    for page_no, page in enumerate(pages, 1):
+        spans = [(m.start(), m.end(), m.group()) for m in re.finditer(r"\S+", page)]
+        for (start, end, word), n in zip(spans, count([w for _, _, w in spans])):
+            if window and tokens + n > max_tokens:
+                # After a page-aligned emit the window may hold only the overlap
+                # tail, which the previous chunk already covers
+                if fresh:
+                    yield emit()
+                    fresh = 0
+                # Keep a tail of at most overlap_tokens that still leaves room for this word
+                while window and (tokens > overlap_tokens or tokens + n > max_tokens):
+                    tokens -= window.popleft()[4]
+            window.append((page_no, offset + start, offset + end, word, n))
+            tokens += n
+            fresh += 1
+        if page_aligned and fresh:
+            yield emit()
+            fresh = 0
+            while window and tokens > overlap_tokens:
+                tokens -= window.popleft()[4]
+        offset += len(page) + 1
+    if fresh:
+        yield emit()
+
+
+def chunk_text(text: str, max_tokens: Optional[int] = None, overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """Split text into overlapping token-bounded chunks."""
+    return [chunk for chunk, _ in iter_chunks([text], max_tokens, overlap_tokens)]
+
+
+def build_document_index(text: str, document_id: str, facts: dict, pages: Optional[List[str]] = None,
+                         extra: Optional[dict] = None) -> dict:
+    """Build RAG index for a document. `extra` fields are stored with the entry."""
+    pages = pages if pages is not None else [text]
+    # Chunk page by page and embed in fixed-size batches as chunks become
+    # available, so peak memory is bounded by one batch rather than the document.
     chunks = []
-    words = text.split()
-    
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = ' '.join(words[i:i + chunk_size])
-        if chunk.strip():
-            chunks.append(chunk)
-            if i + chunk_size >= len(words):
-                break
-    return chunks
+    chunk_meta = []
+    batches = []
+    pending = []
+    for chunk, meta in iter_chunks(pages):
+        chunks.append(chunk)
+        chunk_meta.append(meta)
+        pending.append(chunk)
+        if len(pending) == EMBED_BATCH_SIZE:
+            EMBED_BATCH_SIZES.observe(len(pending), "index")
+            batches.append(EMBED_BATCHER.encode(pending))
+            pending = []
+    if pending:
+        EMBED_BATCH_SIZES.observe(len(pending), "index")
+        batches.append(EMBED_BATCHER.encode(pending))
+
+    if batches:
+        chunk_embeddings = np.concatenate(batches) if len(batches) > 1 else batches[0]
+    else:
+        chunk_embeddings = np.zeros((0, EMBED_MODEL.get().get_sentence_embedding_dimension()), dtype=np.float32)
+    return _store_document_index(document_id, text, facts, chunks, chunk_meta, chunk_embeddings,
+                                 {"page_lengths": [len(p) for p in pages], **(extra or {})})
 
 
-def build_document_index(text: str, document_id: str, facts: dict) -> dict:
-    """Build RAG index for a document."""
-    # Clean text before chunking
-    clean_text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Create chunks
-    chunks = chunk_text(clean_text)
-    
-    # Generate embeddings for chunks
-    chunk_embeddings = EMBED_MODEL.encode(chunks, normalize_embeddings=True)
-    
-    # Store in DOC_STORE with facts
-    DOC_STORE[document_id] = {
-        "chunks": chunks,
-        "embeddings": chunk_embeddings,
+def build_document_indexes(documents: List[Tuple[str, str, dict, Optional[List[str]], Optional[dict]]]
+                           ) -> List[dict]:
+    """
+    Index many (document_id, text, facts, pages, extra) at once.
+    Chunks of all documents are pooled into shared encode batches, so small
+    documents don't each pay for a separate, mostly empty forward pass.
+    """
+    documents = [(document_id, text, facts, pages if pages is not None else [text], extra)
+                 for document_id, text, facts, pages, extra in documents]
+    doc_chunks = [list(iter_chunks(pages)) for _, _, _, pages, _ in documents]
+    all_chunks = [chunk for chunks in doc_chunks for chunk, _ in chunks]
+    dim = EMBED_MODEL.get().get_sentence_embedding_dimension()
+    embeddings = np.zeros((len(all_chunks), dim), dtype=np.float32)
+    for start in range(0, len(all_chunks), EMBED_BATCH_SIZE):
+        batch = all_chunks[start:start + EMBED_BATCH_SIZE]
+        EMBED_BATCH_SIZES.observe(len(batch), "index_batch")
+        embeddings[start:start + len(batch)] = EMBED_BATCHER.encode(batch)
+
+    index_infos = []
+    offset = 0
+    for (document_id, text, facts, pages, extra), chunks in zip(documents, doc_chunks):
+        chunk_embeddings = embeddings[offset:offset + len(chunks)].copy()
+        offset += len(chunks)
+        index_infos.append(_store_document_index(
+            document_id, text, facts, [c for c, _ in chunks], [m for _, m in chunks], chunk_embeddings,
+            {"page_lengths": [len(p) for p in pages], **(extra or {"version": 1})},
+        ))
+    return index_infos
+
+
+# Sparse (BM25) side of hybrid retrieval. Terms keep internal / - . so survey
+# numbers like 123/4A and section numbers like 10(a) stay one token.
+_BM25_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[/.\-][a-z0-9]+)*")
+BM25_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was what when where which who whom with".split()
+)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Fusion weight of the sparse ranking (0 = dense only, 1 = sparse only) and the
+# reciprocal-rank-fusion constant
+HYBRID_SPARSE_WEIGHT = float(os.getenv("LEGALEASE_HYBRID_SPARSE_WEIGHT", "0.5"))
+HYBRID_RRF_K = int(os.getenv("LEGALEASE_HYBRID_RRF_K", "60"))
+# An identifier question is answered from BM25 alone when the best chunk
+# outscores the runner-up by this factor
+HYBRID_DECISIVE_RATIO = float(os.getenv("LEGALEASE_HYBRID_DECISIVE_RATIO", "2.0"))
+
+
+def bm25_terms(text: str) -> List[str]:
+    return [t for t in _BM25_TOKEN_RE.findall(text.lower()) if t not in BM25_STOPWORDS]
+
+
+def build_bm25_index(chunks: List[str]) -> dict:
+    """
+    Inverted index over `chunks` with precomputed BM25 weights.
+    Postings are stored flat: term -> [offset, count] into two parallel arrays
+    of chunk ids (int32) and weights (float32), which spill to disk like embeddings.
+    """
+    postings: Dict[str, Dict[int, int]] = {}
+    lengths = np.zeros(len(chunks), dtype=np.float32)
+    for chunk_id, chunk in enumerate(chunks):
+        terms = bm25_terms(chunk)
+        lengths[chunk_id] = len(terms)
+        for term in terms:
+            tf = postings.setdefault(term, {})
+            tf[chunk_id] = tf.get(chunk_id, 0) + 1
+    avg_len = float(lengths.mean()) if len(chunks) else 0.0
+    n_postings = sum(len(tf) for tf in postings.values())
+    chunk_ids = np.zeros(n_postings, dtype=np.int32)
+    weights = np.zeros(n_postings, dtype=np.float32)
+    terms_index = {}
+    offset = 0
+    for term, tf in postings.items():
+        idf = np.log(1.0 + (len(chunks) - len(tf) + 0.5) / (len(tf) + 0.5))
+        ids = np.fromiter(tf.keys(), dtype=np.int32, count=len(tf))
+        counts = np.fromiter(tf.values(), dtype=np.float32, count=len(tf))
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[ids] / (avg_len or 1.0))
+        chunk_ids[offset:offset + len(tf)] = ids
+        weights[offset:offset + len(tf)] = idf * counts * (BM25_K1 + 1.0) / (counts + norm)
+        terms_index[term] = [offset, len(tf)]
+        offset += len(tf)
+    return {"bm25_terms": terms_index, "bm25_chunk_ids": chunk_ids, "bm25_weights": weights}
+
+
+def bm25_scores(doc_data: dict, terms: List[str]) -> np.ndarray:
+    """BM25 score of every chunk for the query terms (repeated terms count once)."""
+    scores = np.zeros(len(doc_data["chunk_spans"]), dtype=np.float32)
+    for term in set(terms):
+        posting = doc_data["bm25_terms"].get(term)
+        if posting is not None:
+            offset, count = posting
+            np.add.at(scores, doc_data["bm25_chunk_ids"][offset:offset + count],
+                      doc_data["bm25_weights"][offset:offset + count])
+    return scores
+
+
+def reciprocal_rank_fusion(rankings: List[Tuple[np.ndarray, float]], top_k: int, k: int = HYBRID_RRF_K) -> np.ndarray:
+    """Fuse (ranked indices, weight) lists by weighted reciprocal rank; returns the fused top_k."""
+    fused: Dict[int, float] = {}
+    for ranked, weight in rankings:
+        for rank, idx in enumerate(ranked.tolist()):
+            fused[idx] = fused.get(idx, 0.0) + weight / (k + rank + 1)
+    best = sorted(fused, key=lambda i: (-fused[i], i))[:top_k]
+    return np.asarray(best, dtype=np.int64)
+
+
+def quantize_embeddings(embeddings: np.ndarray, storage: str = EMBED_STORAGE) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Compact copy of `embeddings` for storage, plus per-row scales for int8."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if storage == "float16":
+        return embeddings.astype(np.float16), None
+    if storage == "int8":
+        scales = np.abs(embeddings).max(axis=1) / 127.0 if len(embeddings) else np.zeros(0, dtype=np.float32)
+        scales[scales == 0] = 1.0
+        return np.round(embeddings / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    return embeddings, None
+
+
+def score_embeddings(embeddings: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+    """
+    Dot products of a (possibly quantized) embedding matrix with a float32
+    query, or with a (questions, dim) matrix of queries (questions x chunks).
+    """
+    if query.ndim == 1:
+        scores = np.dot(embeddings.astype(np.float32, copy=False), query)
+    else:
+        scores = np.dot(query, embeddings.astype(np.float32, copy=False).T)
+    if scales is not None:
+        scores *= scales
+    return scores
+
+
+def _store_document_index(document_id: str, text: str, facts: dict, chunks: List[str], chunk_meta: List[dict],
+                          chunk_embeddings: np.ndarray, extra: Optional[dict] = None) -> dict:
+    embeddings, scales = quantize_embeddings(chunk_embeddings)
+    # Chunks are stored as offsets into `text` ("\n".join(pages), which is what
+    # iter_chunks' offsets refer to) rather than as overlapping strings;
+    # stored_chunk rebuilds a chunk's text when it is actually returned.
+    entry = {
+        "chunk_spans": np.array([(m["start"], m["end"]) for m in chunk_meta], dtype=np.int32).reshape(-1, 2),
+        "chunk_pages": np.array([(m["page"], m["page_end"]) for m in chunk_meta], dtype=np.int32).reshape(-1, 2),
+        "chunk_tokens": np.array([m["tokens"] for m in chunk_meta], dtype=np.int32),
+        "embeddings": embeddings,
         "text": text,
-        "facts": facts  # Store extracted facts
+        "facts": facts,  # Store extracted facts
+        **(extra or {}),  # page_lengths, page_entities, version history
     }
+    if scales is not None:
+        entry["embedding_scales"] = scales
+    if EMBED_RESCORE and EMBED_STORAGE != "float32":
+        entry["full_embeddings"] = np.asarray(chunk_embeddings, dtype=np.float32)
+    entry.update(build_bm25_index(chunks))
+    # Store in DOC_STORE with facts
+    DOC_STORE[document_id] = entry
+    CORPUS_INDEX.add(document_id, chunk_embeddings)
     
     return {
         "document_id": document_id,
         "num_chunks": py(len(chunks)),
-        "avg_chunk_length": py(sum(len(c) for c in chunks) / len(chunks) if chunks else 0)
+        "avg_chunk_length": py(sum(len(c) for c in chunks) / len(chunks) if chunks else 0),
+        "avg_chunk_tokens": py(sum(m["tokens"] for m in chunk_meta) / len(chunk_meta) if chunk_meta else 0),
+    }
+
+
+_CHUNK_WORD_RE = re.compile(r"\S+")  # the word pattern of iter_chunks
+
+
+def stored_chunk(entry: dict, chunk_id: int) -> str:
+    """Text of one stored chunk, exactly as iter_chunks produced it."""
+    start, end = entry["chunk_spans"][chunk_id]
+    return " ".join(_CHUNK_WORD_RE.findall(entry["text"], int(start), int(end)))
+
+
+def stored_chunks(entry: dict) -> List[str]:
+    return [stored_chunk(entry, i) for i in range(len(entry["chunk_spans"]))]
+
+
+def chunk_location(entry: dict, chunk_id: int) -> dict:
+    """Page range and character span of a stored chunk, as returned with sources."""
+    page, page_end = entry["chunk_pages"][chunk_id]
+    start, end = entry["chunk_spans"][chunk_id]
+    return {"page": int(page), "page_end": int(page_end), "char_start": int(start), "char_end": int(end)}
+
+
+def stored_embeddings(entry: dict) -> np.ndarray:
+    """float32 chunk embeddings of a store entry (exact for float32/float16, dequantized for int8)."""
+    embeddings = entry.get("full_embeddings")
+    if embeddings is None:
+        embeddings = np.asarray(entry["embeddings"], dtype=np.float32)
+        if "embedding_scales" in entry:
+            embeddings = embeddings * entry["embedding_scales"][:, None]
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def stored_pages(entry: dict) -> Optional[List[str]]:
+    """Page texts of a store entry, or None for entries indexed without page lengths."""
+    lengths = entry.get("page_lengths")
+    if lengths is None:
+        return None
+    pages = []
+    offset = 0
+    for length in lengths:
+        pages.append(entry["text"][offset:offset + length])
+        offset += length + 1
+    return pages
+
+
+def first_version_extra(content_hash: str, page_entities: List[list]) -> dict:
+    """
+    Entry fields of a newly analyzed document. Page entities and the version
+    history let /documents/{id}/versions re-analyze an amended upload
+    incrementally; content_sha256 lets it retire the old bytes' cache entry.
+    """
+    return {
+        "page_entities": page_entities,
+        "content_sha256": content_hash,
+        "version": 1,
+        "versions": [{"version": 1, "content_sha256": content_hash, "created_at": time.time(),
+                      "pages_changed": len(page_entities)}],
     }
 
 
+def reuse_page_entities(old_pages: Optional[List[str]], old_entities: Optional[list],
+                        pages: List[str]) -> Tuple[List[Optional[list]], List[int]]:
+    """
+    Line `pages` up against the previous version (difflib over whole pages, so
+    inserted or removed pages don't misalign the rest). Returns the stored NER
+    entities of every unchanged page (None where NER must run) and the 1-based
+    numbers of the new or changed pages.
+    """
+    reused: List[Optional[list]] = [None] * len(pages)
+    if old_pages is not None and old_entities is not None:
+        matcher = difflib.SequenceMatcher(None, old_pages, pages, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                reused[j1:j2] = old_entities[i1:i2]
+    return reused, [i + 1 for i, ents in enumerate(reused) if ents is None]
+
+
+# One amendment at a time per document and process, so two versions of a
+# document can't both be built from the same previous entry. Amendments of
+# different documents run concurrently; a lock is dropped once nobody holds it.
+_reindex_locks: Dict[str, list] = {}  # document_id -> [lock, holders and waiters]
+_reindex_locks_guard = threading.Lock()
+
+
+@contextlib.contextmanager
+def _reindex_lock(document_id: str):
+    with _reindex_locks_guard:
+        slot = _reindex_locks.setdefault(document_id, [threading.Lock(), 0])
+        slot[1] += 1
+    try:
+        with slot[0]:
+            yield
+    finally:
+        with _reindex_locks_guard:
+            slot[1] -= 1
+            if not slot[1]:
+                del _reindex_locks[document_id]
+
+
+def reindex_document(document_id: str, text: str, facts: dict, pages: List[str], extra: dict,
+                     version_record: dict) -> dict:
+    """
+    Store `text` as the next version of an indexed document. Chunks whose text
+    is unchanged keep their stored embeddings; only new chunk texts are
+    embedded. BM25 postings are rebuilt, which is linear in the text and far
+    cheaper. `version_record` is appended to the entry's version history.
+    """
+    with _reindex_lock(document_id):
+        old = DOC_STORE[document_id]
+        reusable = dict(zip(stored_chunks(old), stored_embeddings(old)))
+        chunks = []
+        chunk_meta = []
+        for chunk, meta in iter_chunks(pages):
+            chunks.append(chunk)
+            chunk_meta.append(meta)
+        dim = EMBED_MODEL.get().get_sentence_embedding_dimension()
+        chunk_embeddings = np.zeros((len(chunks), dim), dtype=np.float32)
+        todo = []
+        for i, chunk in enumerate(chunks):
+            vector = reusable.get(chunk)
+            if vector is None:
+                todo.append(i)
+            else:
+                chunk_embeddings[i] = vector
+        for start in range(0, len(todo), EMBED_BATCH_SIZE):
+            batch = todo[start:start + EMBED_BATCH_SIZE]
+            EMBED_BATCH_SIZES.observe(len(batch), "reindex")
+            chunk_embeddings[batch] = EMBED_BATCHER.encode([chunks[i] for i in batch])
+        version = old.get("version", 1) + 1
+        versions = list(old.get("versions", [])) + [{**version_record, "version": version}]
+        info = _store_document_index(document_id, text, facts, chunks, chunk_meta, chunk_embeddings, {
+            "page_lengths": [len(p) for p in pages], **extra, "version": version, "versions": versions,
+        })
+    return {**info, "version": version, "chunks_reused": py(len(chunks) - len(todo)), "chunks_embedded": py(len(todo))}
+
+
+def diff_facts(old: dict, new: dict, prefix: str = "") -> List[dict]:
+    """Fields that differ between two facts dicts; nested dicts are flattened to dotted names."""
+    changes = []
+    for key in list(dict.fromkeys([*old, *new])):
+        before, after = old.get(key), new.get(key)
+        if isinstance(before, dict) or isinstance(after, dict):
+            changes += diff_facts(before or {}, after or {}, f"{prefix}{key}.")
+        elif before != after:
+            changes.append({"field": f"{prefix}{key}", "old": before, "new": after})
+    return changes
+
+
 def detect_intent_and_answer(question: str, facts: dict) -> Tuple[bool, str, str]:
     """Detect if question is about structured facts and answer directly."""
     q_lower = question.lower()
@@ -499,110 +2702,391 @@ def detect_intent_and_answer(question: str, facts: dict) -> Tuple[bool, str, str
     return False, "", ""
 
 
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the `top_k` highest scores, best first, without sorting the whole array."""
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def rank_chunks(query: np.ndarray, embeddings: np.ndarray, scales: Optional[np.ndarray] = None,
+                full_embeddings: Optional[np.ndarray] = None, top_k: int = 3,
+                rescore_factor: int = EMBED_RESCORE_FACTOR) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k chunk indices (best first) and the similarity array.
+    When a full-precision copy is given, the top `rescore_factor * top_k`
+    candidates are rescored against it so quantization can't reorder answers.
+    """
+    ranked, similarities = rank_chunks_many(query[None, :], embeddings, scales, full_embeddings, top_k, rescore_factor)
+    return ranked[0], similarities[0]
+
+
+def rank_chunks_many(queries: np.ndarray, embeddings: np.ndarray, scales: Optional[np.ndarray] = None,
+                     full_embeddings: Optional[np.ndarray] = None, top_k: int = 3,
+                     rescore_factor: int = EMBED_RESCORE_FACTOR) -> Tuple[List[np.ndarray], np.ndarray]:
+    """rank_chunks for a (questions, dim) matrix: one matrix product, then per-question top-k and rescoring."""
+    similarities = score_embeddings(embeddings, scales, queries)
+    if full_embeddings is None:
+        return [top_k_indices(row, top_k) for row in similarities], similarities
+    ranked = []
+    for query, row in zip(queries, similarities):
+        candidates = top_k_indices(row, top_k * rescore_factor)
+        row[candidates] = np.dot(full_embeddings[candidates], query)
+        ranked.append(candidates[top_k_indices(row[candidates], top_k)])
+    return ranked, similarities
+
+
+LOW_CONFIDENCE_ANSWER = (
+    "I'm not confident about the answer. Try asking about specific fields like "
+    "'Vendor', 'Purchaser', 'Amount', 'Survey Number', or 'Property details'."
+)
+
+
 def search_document(question: str, document_id: str, top_k: int = 3) -> dict:
-    """Search for relevant chunks in a document using cosine similarity."""
-    if document_id not in DOC_STORE:
-        raise HTTPException(status_code=404, detail="Document not found")
-    
-    doc_data = DOC_STORE[document_id]
-    chunks = doc_data["chunks"]
-    chunk_embeddings = doc_data["embeddings"]
-    facts = doc_data.get("facts", {})
-    
-    # Step 1: Check if question can be answered from structured facts
-    is_fact_based, intent_type, fact_answer = detect_intent_and_answer(question, facts)
-    if is_fact_based:
-        return {
-            "answer": fact_answer,
-            "sources": [{
-                "chunk_id": -1,
-                "score": 1.0,
-                "text": f"Answer based on extracted {intent_type} information."
-            }],
-            "best_score": 1.0,
-            "answer_source": "structured_facts",
-            "intent_type": intent_type
-        }
-    
-    # Step 2: Use retrieval for other questions
-    # Encode question
-    question_embedding = EMBED_MODEL.encode([question], normalize_embeddings=True)[0]
-    
-    # Compute cosine similarities (since embeddings are normalized, dot product = cosine similarity)
-    similarities = np.dot(chunk_embeddings, question_embedding)
-    
-    # Get top-k indices
-    top_indices = np.argsort(similarities)[-top_k:][::-1]
-    
-    # Check confidence threshold
-    best_score = py(similarities[top_indices[0]]) if top_indices.size > 0 else 0.0
-    
-    # Step 3: Confidence threshold for retrieval answers
-    if best_score < 0.25:
-        return {
-            "answer": "I'm not confident about the answer. Try asking about specific fields like 'Vendor', 'Purchaser', 'Amount', 'Survey Number', or 'Property details'.",
-            "sources": [],
-            "best_score": best_score,
-            "answer_source": "low_confidence",
-            "intent_type": "general"
-        }
-    
+    """Search for relevant chunks in a document: structured facts, then BM25 fused with cosine similarity."""
+    return search_documents([question], [document_id], top_k)[0][0]
+
+
+def search_documents(questions: List[str], document_ids: List[str], top_k: int = 3) -> List[List[dict]]:
+    """
+    Answer every question against every document; results[d][q] has the
+    search_document shape. Questions answered from structured facts or by a
+    decisive keyword match never reach the encoder; the rest are encoded in
+    one batch and scored with one questions x chunks product per document.
+    In a batch, embed_ms and score_ms time those shared steps and total_ms
+    runs from the start of the batch.
+    """
+    started = time.perf_counter()
+    docs = []
+    for document_id in document_ids:
+        try:
+            docs.append(DOC_STORE[document_id])
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Document not found")
+    results: List[List[Optional[dict]]] = [[None] * len(questions) for _ in docs]
+    dense = []  # (doc, question, sparse, sparse_ranked, identifier_hit, timings) still needing embeddings
+
+    for d, doc_data in enumerate(docs):
+        facts = doc_data.get("facts", {})
+        for q, question in enumerate(questions):
+            # Step 1: Check if question can be answered from structured facts
+            step = time.perf_counter()
+            timings = {}
+            is_fact_based, intent_type, fact_answer = detect_intent_and_answer(question, facts)
+            timings["intent_ms"] = (time.perf_counter() - step) * 1000
+            if is_fact_based:
+                timings["total_ms"] = (time.perf_counter() - started) * 1000
+                results[d][q] = {
+                    "answer": fact_answer,
+                    "sources": [{
+                        "chunk_id": -1,
+                        "score": 1.0,
+                        "text": f"Answer based on extracted {intent_type} information."
+                    }],
+                    "best_score": 1.0,
+                    "answer_source": "structured_facts",
+                    "intent_type": intent_type,
+                    "timings": timings,
+                }
+                continue
+
+            # Step 2: Sparse (BM25) scores. For identifier questions (survey/patta
+            # numbers, sections) a decisive keyword match is answered without encoding
+            # the question at all.
+            step = time.perf_counter()
+            terms = bm25_terms(question)
+            sparse = bm25_scores(doc_data, terms)
+            sparse_ranked = top_k_indices(sparse, top_k * EMBED_RESCORE_FACTOR)
+            sparse_ranked = sparse_ranked[sparse[sparse_ranked] > 0]
+            timings["sparse_ms"] = (time.perf_counter() - step) * 1000
+            # Only an identifier that occurs in this document counts, not any digit in the question
+            identifier_hit = sparse_ranked.size > 0 and any(
+                any(ch.isdigit() for ch in t) and t in doc_data["bm25_terms"] for t in terms
+            )
+            decisive = False
+            if identifier_hit:
+                runner_up = sparse[sparse_ranked[1]] if sparse_ranked.size > 1 else 0.0
+                decisive = sparse[sparse_ranked[0]] >= HYBRID_DECISIVE_RATIO * runner_up
+            if decisive:
+                # Scores relative to the best keyword match
+                results[d][q] = _chunk_answer(
+                    doc_data, question, sparse_ranked[:top_k], sparse / sparse[sparse_ranked[0]], 1.0,
+                    "keyword", None, timings, started,
+                )
+            else:
+                dense.append((d, q, sparse, sparse_ranked, identifier_hit, timings))
+    if not dense:
+        return results
+
+    # Step 3: Dense retrieval, fused with the sparse ranking
+    # Encode questions (repeated questions come from the cache), all in one batch
+    step = time.perf_counter()
+    dense_questions = list(dict.fromkeys(questions[q] for _, q, *_ in dense))
+    question_embeddings, cache_hits = embed_questions(dense_questions)
+    row_of = {question: i for i, question in enumerate(dense_questions)}
+    embed_ms = (time.perf_counter() - step) * 1000
+
+    for d, doc_data in enumerate(docs):
+        items = [item for item in dense if item[0] == d]
+        if not items:
+            continue
+        # Compute cosine similarities (since embeddings are normalized, dot product = cosine similarity)
+        step = time.perf_counter()
+        rows = [row_of[questions[q]] for _, q, *_ in items]
+        dense_ranked, similarities = rank_chunks_many(
+            question_embeddings[rows], doc_data["embeddings"], doc_data.get("embedding_scales"),
+            doc_data.get("full_embeddings"), top_k * EMBED_RESCORE_FACTOR,
+        )
+        score_ms = (time.perf_counter() - step) * 1000
+        for (_, q, sparse, sparse_ranked, identifier_hit, timings), ranked, row_similarities in zip(
+                items, dense_ranked, similarities):
+            step = time.perf_counter()
+            if sparse_ranked.size > 0:
+                top_indices = reciprocal_rank_fusion(
+                    [(ranked, 1.0 - HYBRID_SPARSE_WEIGHT), (sparse_ranked, HYBRID_SPARSE_WEIGHT)], top_k,
+                )
+            else:
+                top_indices = ranked[:top_k]
+            timings["embed_ms"] = embed_ms
+            timings["score_ms"] = score_ms + (time.perf_counter() - step) * 1000
+            cache_hit = cache_hits[row_of[questions[q]]]
+
+            # Check confidence threshold
+            best_score = py(row_similarities[top_indices[0]]) if top_indices.size > 0 else 0.0
+            answer_source = "hybrid" if sparse_ranked.size > 0 else "retrieval"
+
+            # Confidence threshold for retrieval answers; an identifier match counts as evidence
+            if best_score < 0.25 and not identifier_hit:
+                timings["total_ms"] = (time.perf_counter() - started) * 1000
+                results[d][q] = {
+                    "answer": LOW_CONFIDENCE_ANSWER,
+                    "sources": [],
+                    "best_score": best_score,
+                    "answer_source": "low_confidence",
+                    "intent_type": "general",
+                    "embedding_cache_hit": cache_hit,
+                    "timings": timings,
+                }
+            else:
+                results[d][q] = _chunk_answer(
+                    doc_data, questions[q], top_indices, row_similarities, best_score,
+                    answer_source, cache_hit, timings, started,
+                )
+    return results
+
+
+def _chunk_answer(doc_data: dict, question: str, top_indices: np.ndarray, similarities: np.ndarray,
+                  best_score: float, answer_source: str, cache_hit: Optional[bool], timings: dict,
+                  started: float) -> dict:
+    """search_document result for the ranked chunks `top_indices`."""
     # Step 4: Prepare results with safe type conversion
     sources = []
+    best_chunk = ""
     for idx in top_indices:
-        chunk_text = chunks[idx]
+        chunk_text = stored_chunk(doc_data, idx)
+        best_chunk = best_chunk or chunk_text
         # Get snippet for this chunk based on the question
         snippet = snippet_around(chunk_text, question)
         sources.append({
             "chunk_id": py(idx),
             "score": py(similarities[idx]),
-            "text": snippet
+            "text": snippet,
+            **chunk_location(doc_data, idx),
         })
-    
+
     # Generate answer from the best matching chunk
-    best_chunk = chunks[top_indices[0]] if top_indices.size > 0 else ""
     answer_text = snippet_around(best_chunk, question, window=300)
-    
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
+
     return {
         "answer": answer_text,
         "sources": sources,
         "best_score": best_score,
-        "answer_source": "retrieval",
+        "answer_source": answer_source,
         "intent_type": "general",
-        "top_indices": [py(i) for i in top_indices]  # For debugging
+        "top_indices": [py(i) for i in top_indices],  # For debugging
+        "embedding_cache_hit": cache_hit,
+        "timings": timings,
     }
 
 
-@app.post("/analyze")
-async def analyze_document(file: UploadFile = File(...)):
-    suffix = os.path.splitext(file.filename)[1] or ".pdf"
+async def extract_pdf_pages_parallel(path: str) -> List[str]:
+    """
+    Extract one PDF with its page ranges spread over CPU_POOL, pages in order.
+    Small documents stay a single task; each worker re-opens the file, which
+    costs far less than the pages it extracts.
+    """
+    page_count = await CPU_POOL.run(pdf_page_count, path)
+    ranges = pdf_page_ranges(page_count, CPU_WORKERS)
+    results = await asyncio.gather(*(
+        CPU_POOL.run(extract_pdf_page_range, path, start, stop) for start, stop in ranges
+    ))
+    pages = [page for range_result in results for page in range_result]
+    for _, error in pages:
+        PDF_PAGES.inc("ok" if error is None else "timeout" if error.startswith("timed out") else "error")
+    return _log_page_errors(path, pages)
+
+
+def extract_pdf_pages_many(paths: List[str]) -> List[Tuple[Optional[List[str]], Optional[str]]]:
+    """Extract several PDFs in one worker; a broken file yields an error instead of failing the batch."""
+    results = []
+    for path in paths:
+        try:
+            results.append((extract_pdf_pages(path), None))
+        except Exception as e:
+            results.append((None, f"Could not read PDF: {e}"))
+    return results
+
+
+def _split_contiguous(items: list, parts: int) -> List[list]:
+    """Split `items` into at most `parts` ordered, roughly equal slices."""
+    if not items:
+        return []
+    size = -(-len(items) // max(1, parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def _run_split(pool: BoundedPool, fn, items: list, parts: int) -> list:
+    """Fan `items` out over `pool` in `parts` slices and return the concatenated, ordered results."""
+    groups = _split_contiguous(items, parts)
+    results = await asyncio.gather(*(pool.run(fn, group) for group in groups))
+    return [r for group_result in results for r in (group_result or [])]
+
+
+_corpus_sync_lock = threading.Lock()
+_corpus_synced_seq = 0
+
+
+def sync_corpus_index():
+    """
+    With the shared store, replay documents added or deleted by other workers
+    into this process's ANN index. A no-op for the in-memory store.
+    """
+    global _corpus_synced_seq
+    if not isinstance(DOC_STORE, SharedDocumentStore):
+        return
+    with _corpus_sync_lock:
+        for seq, document_id, op in DOC_STORE.changes_since(_corpus_synced_seq):
+            _corpus_synced_seq = seq
+            if op == "delete":
+                CORPUS_INDEX.remove(document_id)
+            elif op == "replace" or document_id not in CORPUS_INDEX:
+                try:
+                    entry = DOC_STORE[document_id]
+                except KeyError:
+                    continue  # deleted later in the log
+                CORPUS_INDEX.add(document_id, stored_embeddings(entry))
+
+
+def search_corpus(query: str, top_k: int = 5) -> List[dict]:
+    """Search every indexed document for the chunks closest to `query`."""
+    sync_corpus_index()
+    query_embedding, _ = embed_question(query)
+    results = []
+    for document_id, chunk_id, score in CORPUS_INDEX.search(query_embedding, top_k):
+        try:
+            doc_data = DOC_STORE[document_id]
+            chunk = stored_chunk(doc_data, chunk_id)
+        except (KeyError, IndexError):
+            continue  # deleted between search and lookup
+        results.append({
+            "document_id": document_id,
+            "chunk_id": py(chunk_id),
+            "score": py(score),
+            "text": snippet_around(chunk, query),
+            **chunk_location(doc_data, chunk_id),
+        })
+    return results
+
+
+async def spool_upload(file: UploadFile) -> Tuple[str, str]:
+    """Spool an upload to a temp file in fixed-size blocks, hashing as we go; returns (path, sha256)."""
+    suffix = os.path.splitext(file.filename or "")[1] or ".pdf"
+    hasher = hashlib.sha256()
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(await file.read())
-        tmp_path = tmp.name
+        while True:
+            block = await file.read(UPLOAD_CHUNK_BYTES)
+            if not block:
+                break
+            hasher.update(block)
+            tmp.write(block)
+    return tmp.name, hasher.hexdigest()
+
+
+# How long a streamed /analyze keeps the connection open for the "audio" event
+STREAM_AUDIO_WAIT_SECONDS = float(os.getenv("LEGALEASE_STREAM_AUDIO_WAIT", "60"))
+
+
+def encode_event(event: str, data: dict, fmt: str) -> bytes:
+    """One stream event as an NDJSON line or a server-sent event."""
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=py)}\n\n".encode("utf-8")
+    return (json.dumps({"event": event, "data": data}, ensure_ascii=False, default=py) + "\n").encode("utf-8")
+
 
+async def analysis_events(tmp_path: str, content_hash: str, started: float,
+                          wait_audio: bool) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Run /analyze on a spooled upload, yielding (event, data) as each stage
+    finishes: text, facts (with risk), summaries, index, then result (the
+    complete response). With `wait_audio`, a final audio event follows once
+    TTS is done. Every event's data is a subset of the result keys, so a
+    client can merge events into one object. Deletes `tmp_path`.
+    """
     try:
-        text = extract_text_from_pdf(tmp_path)
+        # Same bytes uploaded before: reuse facts, summaries, audio and index as long
+        # as the indexed document is still around.
+        cached = ANALYSIS_CACHE.get(content_hash)
+        if cached is not None:
+            if cached["document_id"] in DOC_STORE:
+                audio = audio_response(AUDIO_JOBS.submit(cached["summaries"]["tamil"]))
+                ANALYSES.inc("analyze", "hit")
+                STAGE_SECONDS.observe(time.perf_counter() - started, "analyze", "total")
+                yield "result", {**cached, "audio": audio, "cache_hit": True}
+                if wait_audio:
+                    yield "audio", {"audio": audio_response(
+                        await AUDIO_JOBS.wait(audio["audio_id"], STREAM_AUDIO_WAIT_SECONDS))}
+                return
+            ANALYSIS_CACHE.discard(content_hash)
+
+        with STAGE_SECONDS.time("analyze", "pdf_extract"):
+            pages = await extract_pdf_pages_parallel(tmp_path)
     finally:
         os.remove(tmp_path)
-
-    facts = extract_facts(text)
+    text = "\n".join(pages)
+    yield "text", {"doc_text": text[:5000], "content_sha256": content_hash}
+
+    # Timed in the parent (including pool queueing); the worker reports its NER / regex split
+    with STAGE_SECONDS.time("analyze", "facts"):
+        facts, page_entities, fact_timings = await CPU_POOL.run(extract_facts_pages, pages)
+    for stage, seconds in fact_timings.items():
+        STAGE_SECONDS.observe(seconds, "analyze", stage)
     risk = compute_risk_color(facts)
+    yield "facts", {"facts": facts, "risk": risk}
 
-    eng_summary = simple_english_summary(text, facts, risk)
-    ta_summary = full_tamil_summary(text, facts, risk)
+    # Build RAG index, overlapping with the summaries
+    document_id = next(tempfile._get_candidate_names())
+    extra = first_version_extra(content_hash, page_entities)
+    index_started = time.perf_counter()
+    index_task = IO_POOL.submit(build_document_index, text, document_id, facts, pages, extra)
 
-    # Tamil audio
-    audio_filename = next(tempfile._get_candidate_names()) + ".mp3"
-    audio_path = os.path.join(AUDIO_DIR, audio_filename)
-    tts = gTTS(text=ta_summary, lang="ta", slow=False)
-    tts.save(audio_path)
+    with STAGE_SECONDS.time("analyze", "summaries"):
+        eng_summary = simple_english_summary(text, facts, risk)
+        ta_summary = full_tamil_summary(text, facts, risk)
 
-    # Build RAG index
-    document_id = next(tempfile._get_candidate_names())
-    index_info = build_document_index(text, document_id, facts)
+    # Tamil audio is synthesized in the background; poll audio.status_url
+    audio = audio_response(AUDIO_JOBS.submit(ta_summary))
+    yield "summaries", {"summaries": {"english": eng_summary, "tamil": ta_summary}, "audio": audio}
 
-    return {
+    index_info = await asyncio.wrap_future(index_task)
+    STAGE_SECONDS.observe(time.perf_counter() - index_started, "analyze", "index")
+    yield "index", {"document_id": document_id, "version": 1, "index_info": index_info}
+
+    result = {
         "document_id": document_id,
+        "version": 1,
         "index_info": index_info,
         "doc_text": text[:5000],
         "facts": facts,
@@ -610,10 +3094,313 @@ async def analyze_document(file: UploadFile = File(...)):
             "english": eng_summary,
             "tamil": ta_summary,
         },
-        "audio": {
-            "tamil_summary_mp3_url": f"/audio/{audio_filename}",
+        "audio": audio,
+        "risk": risk,
+        "content_sha256": content_hash,
+    }
+    ANALYSIS_CACHE.put(content_hash, result)
+    ANALYSES.inc("analyze", "miss")
+    STAGE_SECONDS.observe(time.perf_counter() - started, "analyze", "total")
+    yield "result", {**result, "cache_hit": False}
+    if wait_audio:
+        yield "audio", {"audio": audio_response(await AUDIO_JOBS.wait(audio["audio_id"], STREAM_AUDIO_WAIT_SECONDS))}
+
+
+async def stream_events(events: AsyncIterator[Tuple[str, dict]], fmt: str) -> AsyncIterator[bytes]:
+    # Headers are already sent, so a failing stage becomes an error event
+    try:
+        async for event, data in events:
+            yield encode_event(event, data, fmt)
+    except HTTPException as e:
+        yield encode_event("error", {"status_code": e.status_code, "detail": e.detail}, fmt)
+    except Exception as e:
+        logger.exception("streamed analysis failed")
+        yield encode_event("error", {"status_code": 500, "detail": str(e)}, fmt)
+
+
+@app.post("/analyze")
+async def analyze_document(file: UploadFile = File(...), stream: Optional[str] = None):
+    """
+    Analyze one PDF. With ?stream=ndjson (one JSON object per line) or
+    ?stream=sse (server-sent events) every stage is sent as soon as it
+    finishes; see analysis_events for the event sequence.
+    """
+    if stream not in (None, "ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="stream must be ndjson or sse")
+    started = time.perf_counter()
+    with STAGE_SECONDS.time("analyze", "spool"):
+        tmp_path, content_hash = await spool_upload(file)
+
+    events = analysis_events(tmp_path, content_hash, started, wait_audio=stream is not None)
+    if stream is not None:
+        return StreamingResponse(
+            stream_events(events, stream),
+            media_type="text/event-stream" if stream == "sse" else "application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    result = None
+    async for event, data in events:
+        if event == "result":
+            result = data
+    return result
+
+
+@app.post("/documents/{document_id}/versions")
+async def amend_document(document_id: str, file: UploadFile = File(...)):
+    """
+    Attach an amended version of the PDF (rectification, corrected pages) to an
+    indexed document. Only new or changed pages go through NER and only changed
+    chunks are re-embedded; the response reports which facts changed.
+    """
+    started = time.perf_counter()
+    if document_id not in DOC_STORE:
+        raise HTTPException(status_code=404, detail="Document not found")
+    with STAGE_SECONDS.time("amend", "spool"):
+        tmp_path, content_hash = await spool_upload(file)
+    try:
+        with STAGE_SECONDS.time("amend", "pdf_extract"):
+            pages = await extract_pdf_pages_parallel(tmp_path)
+    finally:
+        os.remove(tmp_path)
+    text = "\n".join(pages)
+    try:
+        old = DOC_STORE[document_id]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Document not found")
+    old_pages = stored_pages(old)
+
+    reused, changed_pages = reuse_page_entities(old_pages, old.get("page_entities"), pages)
+    with STAGE_SECONDS.time("amend", "facts"):
+        facts, page_entities, fact_timings = await CPU_POOL.run(extract_facts_pages, pages, reused)
+    for stage, seconds in fact_timings.items():
+        STAGE_SECONDS.observe(seconds, "amend", stage)
+    risk = compute_risk_color(facts)
+    old_risk = compute_risk_color(old["facts"])
+
+    with STAGE_SECONDS.time("amend", "summaries"):
+        eng_summary = simple_english_summary(text, facts, risk)
+        ta_summary = full_tamil_summary(text, facts, risk)
+    audio = audio_response(AUDIO_JOBS.submit(ta_summary))
+
+    with STAGE_SECONDS.time("amend", "index"):
+        index_info = await IO_POOL.run(
+            reindex_document, document_id, text, facts, pages,
+            {"page_entities": page_entities, "content_sha256": content_hash},
+            {"content_sha256": content_hash, "created_at": time.time(), "pages_changed": len(changed_pages)},
+        )
+
+    result = {
+        "document_id": document_id,
+        "version": index_info["version"],
+        "index_info": index_info,
+        "doc_text": text[:5000],
+        "facts": facts,
+        "summaries": {
+            "english": eng_summary,
+            "tamil": ta_summary,
         },
+        "audio": audio,
         "risk": risk,
+        "content_sha256": content_hash,
+    }
+    # The previous bytes no longer describe this document_id
+    if old.get("content_sha256"):
+        ANALYSIS_CACHE.discard(old["content_sha256"])
+    ANALYSIS_CACHE.put(content_hash, result)
+    STAGE_SECONDS.observe(time.perf_counter() - started, "amend", "total")
+    return {
+        **result,
+        "cache_hit": False,
+        "changes": {
+            "previous_version": index_info["version"] - 1,
+            "page_count": {"old": len(old_pages) if old_pages is not None else None, "new": len(pages)},
+            "pages_changed": changed_pages,
+            "fields": diff_facts(old["facts"], facts),
+            "risk": {"old": old_risk, "new": risk} if old_risk != risk else None,
+            "chunks_reused": index_info["chunks_reused"],
+            "chunks_embedded": index_info["chunks_embedded"],
+        },
+    }
+
+
+BATCH_MAX_MEMBER_BYTES = int(float(os.getenv("LEGALEASE_BATCH_MAX_MEMBER_MB", "100")) * 1024 * 1024)
+BATCH_MAX_TOTAL_BYTES = int(float(os.getenv("LEGALEASE_BATCH_MAX_TOTAL_MB", "1024")) * 1024 * 1024)
+
+
+def _copy_hashed(src, path: str, limit: int) -> Tuple[str, int]:
+    """Copy `src` to `path` in blocks, hashing as we go; 413 past `limit` bytes. Returns (sha256, size)."""
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as out:
+        while True:
+            block = src.read(UPLOAD_CHUNK_BYTES)
+            if not block:
+                break
+            size += len(block)
+            if size > limit:
+                raise HTTPException(status_code=413, detail="Batch upload exceeds the size limit")
+            hasher.update(block)
+            out.write(block)
+    return hasher.hexdigest(), size
+
+
+def spool_batch_files(uploads: List[Tuple[Optional[str], BinaryIO]], tmp_dir: str) -> List[Tuple[str, str, str]]:
+    """
+    Write (filename, file object) uploads into `tmp_dir`, expanding .zip archives
+    into their PDF members; returns (filename, path, sha256) per document. Zip
+    members are checked against LEGALEASE_BATCH_MAX_MEMBER_MB and the running
+    total against LEGALEASE_BATCH_MAX_TOTAL_MB by their declared size before
+    anything is decompressed (and by the bytes actually written), so a zip bomb
+    is rejected with 413 instead of filling memory or disk.
+    """
+    items = []
+    total = 0
+    for filename, src in uploads:
+        suffix = os.path.splitext(filename or "")[1].lower() or ".pdf"
+        path = os.path.join(tmp_dir, f"{len(items)}{suffix}")
+        limit = min(BATCH_MAX_MEMBER_BYTES, BATCH_MAX_TOTAL_BYTES - total) if suffix != ".zip" else BATCH_MAX_TOTAL_BYTES
+        content_hash, size = _copy_hashed(src, path, limit)
+        if suffix != ".zip":
+            total += size
+            items.append((filename, path, content_hash))
+            if len(items) > BATCH_MAX_FILES:
+                break
+            continue
+        try:
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.infolist():
+                    if member.is_dir() or not member.filename.lower().endswith(".pdf"):
+                        continue
+                    if member.file_size > BATCH_MAX_MEMBER_BYTES or total + member.file_size > BATCH_MAX_TOTAL_BYTES:
+                        raise HTTPException(status_code=413, detail=f"{member.filename} in {filename} is too large")
+                    member_path = os.path.join(tmp_dir, f"{len(items)}.pdf")
+                    with archive.open(member) as member_src:
+                        member_hash, size = _copy_hashed(member_src, member_path, member.file_size)
+                    total += size
+                    items.append((member.filename, member_path, member_hash))
+                    if len(items) > BATCH_MAX_FILES:
+                        break
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail=f"{filename} is not a valid zip archive")
+        os.remove(path)
+        if len(items) > BATCH_MAX_FILES:
+            break
+    if not items:
+        raise HTTPException(status_code=400, detail="No PDF files in upload")
+    if len(items) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_FILES} documents per batch")
+    return items
+
+
+@app.post("/analyze_batch")
+async def analyze_batch(files: List[UploadFile] = File(...)):
+    """
+    Analyze many PDFs (or .zip archives of PDFs) in one request.
+    spaCy runs through nlp.pipe and all documents share embedding batches.
+    """
+    timings = {}
+    started = time.perf_counter()
+    stage_start = started
+
+    # Spool uploads to disk, expanding zip archives into their PDF members (off the event loop)
+    tmp_dir = tempfile.mkdtemp(prefix="legalease_batch_")
+    try:
+        items = await IO_POOL.run(spool_batch_files, [(upload.filename, upload.file) for upload in files], tmp_dir)
+        timings["spool"] = time.perf_counter() - stage_start
+
+        # Cache hits skip every remaining stage
+        results: List[Optional[dict]] = [None] * len(items)
+        todo = []
+        for i, (filename, path, content_hash) in enumerate(items):
+            cached = ANALYSIS_CACHE.get(content_hash)
+            if cached is not None:
+                if cached["document_id"] in DOC_STORE:
+                    audio = audio_response(AUDIO_JOBS.submit(cached["summaries"]["tamil"]))
+                    results[i] = {"filename": filename, **cached, "audio": audio, "cache_hit": True}
+                    continue
+                ANALYSIS_CACHE.discard(content_hash)
+            todo.append(i)
+
+        stage_start = time.perf_counter()
+        extracted = await _run_split(CPU_POOL, extract_pdf_pages_many, [items[i][1] for i in todo], CPU_WORKERS)
+        timings["extract"] = time.perf_counter() - stage_start
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    ok = []
+    for i, (pages, error) in zip(todo, extracted):
+        if error:
+            results[i] = {"filename": items[i][0], "error": error}
+        else:
+            ok.append((i, pages, "\n".join(pages)))
+
+    stage_start = time.perf_counter()
+    facts_list = await _run_split(
+        CPU_POOL, functools.partial(extract_facts_batch, batch_size=NLP_BATCH_SIZE, n_process=NLP_N_PROCESS),
+        [pages for _, pages, _ in ok], CPU_WORKERS,
+    )
+    timings["facts"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    analyses = []
+    for (i, pages, text), (facts, page_entities) in zip(ok, facts_list):
+        risk = compute_risk_color(facts)
+        analyses.append({
+            "index": i,
+            "pages": pages,
+            "page_entities": page_entities,
+            "text": text,
+            "facts": facts,
+            "risk": risk,
+            "eng_summary": simple_english_summary(text, facts, risk),
+            "ta_summary": full_tamil_summary(text, facts, risk),
+            "document_id": next(tempfile._get_candidate_names()),
+        })
+    timings["summaries"] = time.perf_counter() - stage_start
+
+    # Audio is only queued here; identical summaries share one synthesis
+    stage_start = time.perf_counter()
+    for a in analyses:
+        a["audio"] = audio_response(AUDIO_JOBS.submit(a["ta_summary"]))
+    timings["audio_enqueue"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    index_infos = await IO_POOL.run(
+        build_document_indexes,
+        [(a["document_id"], a["text"], a["facts"], a["pages"],
+          first_version_extra(items[a["index"]][2], a["page_entities"])) for a in analyses],
+    )
+    timings["index"] = time.perf_counter() - stage_start
+
+    for a, index_info in zip(analyses, index_infos):
+        filename, _, content_hash = items[a["index"]]
+        result = {
+            "document_id": a["document_id"],
+            "version": 1,
+            "index_info": index_info,
+            "doc_text": a["text"][:5000],
+            "facts": a["facts"],
+            "summaries": {
+                "english": a["eng_summary"],
+                "tamil": a["ta_summary"],
+            },
+            "audio": a["audio"],
+            "risk": a["risk"],
+            "content_sha256": content_hash,
+        }
+        ANALYSIS_CACHE.put(content_hash, result)
+        results[a["index"]] = {"filename": filename, **result, "cache_hit": False}
+
+    timings["total"] = time.perf_counter() - started
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, "analyze_batch", stage)
+    ANALYSES.inc("analyze_batch", "hit", amount=len(items) - len(todo))
+    ANALYSES.inc("analyze_batch", "miss", amount=len(todo))
+    return {
+        "documents": results,
+        "count": py(len(results)),
+        "timings_sec": {k: round(v, 4) for k, v in timings.items()},
+        "docs_per_sec": round(len(results) / timings["total"], 2) if timings["total"] > 0 else None,
     }
 
 
@@ -627,44 +3414,164 @@ async def ask_question(request: dict):
         raise HTTPException(status_code=400, detail="Missing document_id or question")
     
     try:
-        result = search_document(question, document_id)
-        return {
-            "question": question,
-            "answer": result["answer"],
-            "sources": result["sources"],
-            "best_similarity": result["best_score"],
-            "answer_source": result.get("answer_source", "retrieval"),
-            "intent_type": result.get("intent_type", "general"),
-            "top_indices": result.get("top_indices", [])  # For debugging
-        }
+        result = await QUERY_POOL.run(search_document, question, document_id)
+        # search_document already times its steps; recording them here adds no clock reads
+        ANSWERS.inc(result.get("answer_source", "retrieval"))
+        for step, ms in result.get("timings", {}).items():
+            STAGE_SECONDS.observe(ms / 1000, "ask", step[:-3])
+        return ask_response(question, result)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
 
 
+def ask_response(question: str, result: dict) -> dict:
+    return {
+        "question": question,
+        "answer": result["answer"],
+        "sources": result["sources"],
+        "best_similarity": result["best_score"],
+        "answer_source": result.get("answer_source", "retrieval"),
+        "intent_type": result.get("intent_type", "general"),
+        "top_indices": result.get("top_indices", []),  # For debugging
+        "embedding_cache_hit": result.get("embedding_cache_hit"),
+        "timings_ms": {k[:-3]: round(v, 3) for k, v in result.get("timings", {}).items()},
+    }
+
+
+ASK_BATCH_MAX_QUESTIONS = int(os.getenv("LEGALEASE_ASK_BATCH_MAX_QUESTIONS", "100"))
+ASK_BATCH_MAX_DOCUMENTS = int(os.getenv("LEGALEASE_ASK_BATCH_MAX_DOCUMENTS", "50"))
+
+
+@app.post("/ask_batch")
+async def ask_batch(request: dict):
+    """
+    Ask a checklist of questions about one document ("document_id") or several
+    ("document_ids"). Questions are encoded once for all documents and scored
+    with one matrix product per document; each answer has the /ask shape.
+    """
+    questions = request.get("questions")
+    document_ids = request.get("document_ids") or ([request["document_id"]] if request.get("document_id") else None)
+    if not questions or not document_ids:
+        raise HTTPException(status_code=400, detail="Missing questions or document_id(s)")
+    # A bare string would otherwise be iterated as one-character questions or ids
+    if not isinstance(questions, list) or not isinstance(document_ids, list):
+        raise HTTPException(status_code=400, detail="questions and document_ids must be lists")
+    if not all(isinstance(q, str) and q.strip() for q in questions) or not all(isinstance(d, str) for d in document_ids):
+        raise HTTPException(status_code=400, detail="questions and document_ids must be non-empty strings")
+    if len(questions) > ASK_BATCH_MAX_QUESTIONS or len(document_ids) > ASK_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {ASK_BATCH_MAX_QUESTIONS} questions and {ASK_BATCH_MAX_DOCUMENTS} documents per batch",
+        )
+
+    started = time.perf_counter()
+    try:
+        results = await QUERY_POOL.run(search_documents, questions, document_ids)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing questions: {str(e)}")
+    for doc_results in results:
+        for result in doc_results:
+            ANSWERS.inc(result.get("answer_source", "retrieval"))
+    elapsed = time.perf_counter() - started
+    STAGE_SECONDS.observe(elapsed, "ask_batch", "total")
+    return {
+        "results": [
+            {"document_id": document_id, "answers": [ask_response(q, r) for q, r in zip(questions, doc_results)]}
+            for document_id, doc_results in zip(document_ids, results)
+        ],
+        "timings_ms": {"total": round(elapsed * 1000, 3)},
+    }
+
+
+@app.post("/search")
+async def search_all_documents(request: dict):
+    """Search across all documents for the most relevant chunks."""
+    query = request.get("query")
+    if not query:
+        raise HTTPException(status_code=400, detail="Missing query")
+    try:
+        top_k = int(request.get("top_k", 5))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="top_k must be an integer")
+    top_k = max(1, min(top_k, 100))
+
+    results = await QUERY_POOL.run(search_corpus, query, top_k)
+    return {
+        "query": query,
+        "results": results,
+        "index": CORPUS_INDEX.stats(),
+    }
+
+
 @app.get("/documents")
 async def list_documents():
     """List all documents in the store."""
+    documents = DOC_STORE.keys()
     return {
-        "documents": list(DOC_STORE.keys()),
-        "count": py(len(DOC_STORE))
+        "documents": documents,
+        "count": py(len(documents)),
+        "store": DOC_STORE.stats(),
     }
 
 
 @app.delete("/documents/{document_id}")
 async def delete_document(document_id: str):
     """Remove a document from the store."""
-    if document_id in DOC_STORE:
+    try:
         del DOC_STORE[document_id]
-        return {"message": f"Document {document_id} deleted"}
-    else:
+    except KeyError:
         raise HTTPException(status_code=404, detail="Document not found")
+    CORPUS_INDEX.remove(document_id)
+    return {"message": f"Document {document_id} deleted"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of stage latencies, answer paths and store sizes."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += render_gauges()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 503 until the models are loaded and warmed, in this process and every CPU_POOL worker."""
+    body = {
+        "ready": READINESS.ready,
+        "error": READINESS.error,
+        "models": {m.name: {"loaded": m.loaded, "load_seconds": m.load_seconds} for m in (NER_MODEL, EMBED_MODEL)},
+        "startup_phases": READINESS.phases,
+    }
+    if not READINESS.ready:
+        raise HTTPException(status_code=503, detail=body)
+    return body
+
+
+@app.get("/audio/status/{audio_id}")
+async def get_audio_status(audio_id: str):
+    """Status of a background audio job: pending, running, done or failed."""
+    status = AUDIO_JOBS.status(audio_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Audio job not found")
+    return status
 
 
 @app.get("/audio/{filename}")
 async def get_audio(filename: str):
     path = os.path.join(AUDIO_DIR, filename)
     if os.path.exists(path):
-        return FileResponse(path, media_type="audio/mpeg")
+        media_type = "audio/wav" if filename.endswith(".wav") else "audio/mpeg"
+        return FileResponse(path, media_type=media_type)
     return {"error": "Audio not found"}
\ No newline at end of file
@@ -1,6 +1,6 @@
 'use client'
 
-import { useMemo, useState } from 'react'
+import { useEffect, useMemo, useState } from 'react'
 
 const API_BASE = 'http://127.0.0.1:8000'
 
@@ -21,6 +21,7 @@ export default function Home() {
   const [qaLoading, setQaLoading] = useState(false)
   const [qaResult, setQaResult] = useState<any>(null)
   const [qaError, setQaError] = useState('')
+  const [audioStatus, setAudioStatus] = useState('')
 
   async function analyzeFile(file: File) {
     setError('')
@@ -33,18 +34,43 @@ export default function Home() {
       const formData = new FormData()
       formData.append('file', file)
 
-      const res = await fetch(`${API_BASE}/analyze`, {
+      // Streamed: one JSON line per finished stage (text, facts, summaries, index,
+      // result, audio); each event's data is merged into the result as it arrives.
+      // The analysis is complete at the result event; audio is left to the
+      // status polling below instead of holding the spinner and the stream open.
+      const res = await fetch(`${API_BASE}/analyze?stream=ndjson`, {
         method: 'POST',
         body: formData,
       })
 
-      if (!res.ok) {
+      if (!res.ok || !res.body) {
         const text = await res.text()
         throw new Error(text || `HTTP ${res.status}`)
       }
 
-      const data = await res.json()
-      setResult(data)
+      const reader = res.body.getReader()
+      const decoder = new TextDecoder()
+      let buffered = ''
+      let finished = false
+      while (!finished) {
+        const { done, value } = await reader.read()
+        buffered += decoder.decode(value || new Uint8Array(), { stream: !done })
+        const lines = buffered.split('\n')
+        buffered = lines.pop() || ''
+        for (const line of lines) {
+          if (!line.trim()) continue
+          const { event, data } = JSON.parse(line)
+          if (event === 'error') throw new Error(data?.detail || 'Analysis failed')
+          setResult((prev: any) => ({ ...(prev || {}), ...data }))
+          if (event === 'result') {
+            finished = true
+            setLoading(false)
+            reader.cancel().catch(() => {})
+            break
+          }
+        }
+        if (done) break
+      }
     } catch (err: any) {
       setError(err?.message || 'Upload failed')
     } finally {
@@ -125,10 +151,35 @@ export default function Home() {
       ? 'from-rose-500/15 to-rose-500/5 border-rose-500/30 text-rose-200'
       : 'from-slate-500/10 to-slate-500/5 border-white/10 text-slate-200'
 
+  // Audio is synthesized in the background; poll until the file is ready.
+  useEffect(() => {
+    const statusUrl = result?.audio?.status_url
+    setAudioStatus(result?.audio?.status || '')
+    if (!statusUrl || result?.audio?.status === 'done') return
+
+    let cancelled = false
+    const poll = async () => {
+      try {
+        const res = await fetch(`${API_BASE}${statusUrl}`)
+        if (!res.ok) throw new Error(`HTTP ${res.status}`)
+        const data = await res.json()
+        if (cancelled) return
+        setAudioStatus(data.status)
+        if (data.status === 'pending' || data.status === 'running') setTimeout(poll, 1000)
+      } catch {
+        if (!cancelled) setAudioStatus('failed')
+      }
+    }
+    poll()
+    return () => {
+      cancelled = true
+    }
+  }, [result])
+
   const audioUrl = useMemo(() => {
     const p = result?.audio?.tamil_summary_mp3_url
-    return p ? `${API_BASE}${p}` : ''
-  }, [result])
+    return p && audioStatus === 'done' ? `${API_BASE}${p}` : ''
+  }, [result, audioStatus])
 
   const mainAmount = result?.facts?.amounts?.[0] || '-'
   const survey = result?.facts?.property?.survey_no || '-'
@@ -312,9 +363,10 @@ export default function Home() {
                           {qaResult.sources?.map((source: any, index: number) => (
                             <div key={index} className="border-l-2 border-cyan-500/50 pl-3 py-1">
                               <div className="text-xs text-slate-500">
-                                Chunk #{source.chunk_id} • Similarity: {(source.similarity * 100).toFixed(1)}%
+                                {source.page ? `Page ${source.page}${source.page_end > source.page ? `–${source.page_end}` : ''} • ` : ''}
+                                Chunk #{source.chunk_id} • Similarity: {(source.score * 100).toFixed(1)}%
                               </div>
-                              <div className="text-sm text-slate-300 mt-1">{source.snippet}</div>
+                              <div className="text-sm text-slate-300 mt-1">{source.text}</div>
                             </div>
                           ))}
                         </div>
@@ -345,6 +397,11 @@ export default function Home() {
               <div className="rounded-2xl border border-white/10 bg-slate-900/40 p-6">
                 <div className="text-sm font-bold">Tamil audio</div>
                 <p className="mt-2 text-sm text-slate-400">Listen to the generated spoken explanation.</p>
+                {audioStatus === 'pending' || audioStatus === 'running' ? (
+                  <p className="mt-4 text-xs text-slate-400">Generating audio…</p>
+                ) : audioStatus === 'failed' ? (
+                  <p className="mt-4 text-xs text-rose-300">Audio generation failed.</p>
+                ) : null}
                 <audio className="mt-4 w-full" controls src={audioUrl} />
               </div>
 
@@ -0,0 +1,21 @@
+import os
+import sys
+
+# Before main is imported: no gTTS calls and no startup warmup in tests
+os.environ.setdefault("LEGALEASE_TTS_BACKEND", "stub")
+os.environ.setdefault("LEGALEASE_WARMUP", "0")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # One app lifespan for the whole run: shutdown closes the worker pools for good
+    import main
+
+    with TestClient(main.app) as c:
+        yield c
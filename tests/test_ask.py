@@ -0,0 +1,44 @@
+import pytest
+
+import main
+from benchmarks.synthetic import deed_pages, pages_pdf
+
+
+@pytest.fixture(scope="module")
+def document_id(client):
+    pdf = pages_pdf(deed_pages(seed=11, pages=3))
+    return client.post("/analyze", files={"file": ("deed.pdf", pdf, "application/pdf")}).json()["document_id"]
+
+
+def test_absent_identifier_is_not_a_keyword_answer(client, document_id):
+    assert "17" not in main.DOC_STORE[document_id]["bm25_terms"]
+    answer = client.post("/ask", json={"document_id": document_id,
+                                       "question": "Does section 17 mention courts?"}).json()
+    assert answer["answer_source"] != "keyword"
+    assert answer["best_similarity"] < 1.0
+
+
+def test_present_identifier_is_a_keyword_answer(client, document_id):
+    survey = next(line for line in deed_pages(seed=11, pages=3)[0].split("\n") if line.startswith("Survey No"))
+    number = survey.split(":")[1].strip()
+    answer = client.post("/ask", json={"document_id": document_id,
+                                       "question": f"What is recorded for {number}?"}).json()
+    assert answer["answer_source"] == "keyword"
+    assert number in answer["sources"][0]["text"]
+
+
+@pytest.mark.parametrize("payload", [
+    {"questions": "boundaries"},
+    {"questions": ["boundaries"], "document_ids": "abc"},
+    {"questions": ["boundaries", 3]},
+    {"questions": [""]},
+])
+def test_ask_batch_rejects_malformed_payloads(client, document_id, payload):
+    payload = {"document_id": document_id, **payload}
+    assert client.post("/ask_batch", json=payload).status_code == 400
+
+
+def test_ask_batch_answers_every_question(client, document_id):
+    questions = ["What are the boundaries?", "Who pays stamp duty?"]
+    response = client.post("/ask_batch", json={"document_id": document_id, "questions": questions}).json()
+    assert [len(r["answers"]) for r in response["results"]] == [2]
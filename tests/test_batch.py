@@ -0,0 +1,37 @@
+import io
+import zipfile
+
+import main
+from benchmarks.synthetic import deed_pdf
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_batch_expands_zip_and_reports_version(client):
+    archive = _zip([("a.pdf", deed_pdf(seed=21)), ("b.pdf", deed_pdf(seed=22)), ("notes.txt", b"skip")])
+    response = client.post("/analyze_batch", files=[("files", ("deeds.zip", archive, "application/zip"))])
+    assert response.status_code == 200
+    documents = response.json()["documents"]
+    assert [d["filename"] for d in documents] == ["a.pdf", "b.pdf"]
+    assert all(d["version"] == 1 for d in documents)
+
+
+def test_batch_rejects_oversized_zip_member(client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_MEMBER_BYTES", 64 * 1024)
+    bomb = _zip([("bomb.pdf", b"\0" * (1024 * 1024))])
+    assert len(bomb) < 64 * 1024
+    response = client.post("/analyze_batch", files=[("files", ("bomb.zip", bomb, "application/zip"))])
+    assert response.status_code == 413
+
+
+def test_batch_rejects_oversized_total(client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_TOTAL_BYTES", 1024 * 1024)
+    archive = _zip([(f"{i}.pdf", b"\0" * (400 * 1024)) for i in range(3)])
+    response = client.post("/analyze_batch", files=[("files", ("many.zip", archive, "application/zip"))])
+    assert response.status_code == 413
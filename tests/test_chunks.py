@@ -0,0 +1,22 @@
+import main
+
+
+def _count(words):
+    return [3 if word == "huge" else 1 for word in words]
+
+
+def test_page_aligned_overlap_tail_is_not_emitted_twice():
+    chunks = [chunk for chunk, _ in main.iter_chunks(
+        ["aa bb cc dd", "huge ee"], max_tokens=4, overlap_tokens=2, count=_count, page_aligned=True,
+    )]
+    assert chunks == ["aa bb cc dd", "dd huge", "ee"]
+
+
+def test_chunks_cover_every_word_within_budget():
+    pages = [" ".join(f"w{p}x{i}" for i in range(37)) for p in range(5)]
+    for page_aligned in (False, True):
+        chunked = list(main.iter_chunks(pages, max_tokens=8, overlap_tokens=3, count=_count, page_aligned=page_aligned))
+        assert all(meta["tokens"] <= 8 for _, meta in chunked)
+        words = {word for chunk, _ in chunked for word in chunk.split()}
+        assert words == {word for page in pages for word in page.split()}
+        assert len({chunk for chunk, _ in chunked}) == len(chunked)
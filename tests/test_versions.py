@@ -0,0 +1,35 @@
+import main
+from benchmarks.synthetic import deed_pages, pages_pdf
+
+
+def test_batch_document_amend_retires_cached_analysis(client):
+    pages = deed_pages(seed=7, pages=2)
+    original = pages_pdf(pages)
+    batch = client.post("/analyze_batch", files=[("files", ("deed.pdf", original, "application/pdf"))])
+    assert batch.status_code == 200
+    document = batch.json()["documents"][0]
+    document_id = document["document_id"]
+    entry = main.DOC_STORE[document_id]
+    assert entry["content_sha256"] == document["content_sha256"]
+    assert len(entry["page_entities"]) == len(pages)
+    assert [v["version"] for v in entry["versions"]] == [1]
+
+    vendor = document["facts"]["role_parties"]["vendor"] or document["facts"]["parties"][0]
+    amended = [page.replace(vendor, "Senthil Selvam") for page in pages]
+    amend = client.post(f"/documents/{document_id}/versions",
+                        files={"file": ("deed.pdf", pages_pdf(amended), "application/pdf")})
+    assert amend.status_code == 200
+    assert amend.json()["version"] == 2
+
+    # The original bytes no longer describe document_id, so they must be analyzed afresh
+    again = client.post("/analyze", files={"file": ("deed.pdf", original, "application/pdf")}).json()
+    assert again["cache_hit"] is False
+    assert again["document_id"] != document_id
+
+
+def test_entry_size_counts_structured_fields():
+    entry = {"text": "x", "facts": {"parties": ["A"]}, "page_entities": [], "versions": []}
+    base = main.DocumentStore._entry_nbytes(entry)
+    entry["page_entities"] = [[("PERSON", "Karthik Krishnan", 10, 26)] * 50]
+    entry["versions"] = [{"version": v, "content_sha256": "0" * 64} for v in range(1, 6)]
+    assert main.DocumentStore._entry_nbytes(entry) > base + 50 * 30 + 5 * 64